@@ -1,90 +1,2129 @@
 import os
 import sys
+import errno
+import ctypes
+import ctypes.util
+import select
+import struct
 import json
+import mmap
+import zlib
+import hashlib
+import sqlite3
+import time
+import queue
 import shutil
+import stat
+import threading
+from array import array
 from pathlib import Path
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
 
 # --- PyQt6 Imports ---
 from PyQt6.QtWidgets import (
-    QApplication, QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
+    QApplication, QWidget, QVBoxLayout, QHBoxLayout, QGridLayout, QPushButton,
     QLabel, QLineEdit, QFileDialog, QListWidget, QCheckBox,
-    QMessageBox, QTextEdit, QProgressBar
+    QMessageBox, QTextEdit, QProgressBar, QComboBox, QGroupBox
 )
 from PyQt6.QtCore import QThread, QObject, pyqtSignal, Qt
 
-# --- Core Synchronization Logic ---
+# --- Scanning ---
 
-def sync_folders_for_gui(worker, source_dir: Path, dest_dirs: list[Path], dry_run: bool):
-    try:
-        worker.progress.emit(f"Scanning for files to sync from '{source_dir}'...")
+SCAN_THREADS = 8
+# Directories listed ahead of the consumer. Caps what a stalled planner leaves sitting in finished results.
+SCAN_AHEAD = 64
+
+def _scan_directory(worker, root, rel_dir, dir_cache=None, mtime_ns=None):
+    if worker.is_cancellation_requested():
+        return [], []
+    dir_path = os.path.join(root, rel_dir) if rel_dir else root
+    files = []
+    subdirs = []
+    subdir_mtimes = {}
+    cached = dir_cache.cached(rel_dir, mtime_ns) if dir_cache else None
+    if cached is not None:
+        # Unchanged directory: same names as last time, so neither list it nor stat its files (stat is None).
+        names, cached_subdirs = cached
+        files = [(name, None) for name in names]
+        for name in cached_subdirs:
+            try:
+                subdir_mtimes[name] = os.stat(os.path.join(dir_path, name)).st_mtime_ns
+            except OSError:
+                continue
+            subdirs.append(name)
+    else:
+        try:
+            with os.scandir(dir_path) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir():
+                            if not entry.is_symlink():
+                                subdirs.append(entry.name)
+                                if dir_cache:
+                                    subdir_mtimes[entry.name] = entry.stat().st_mtime_ns
+                            continue
+                        st = entry.stat()
+                        if not stat.S_ISREG(st.st_mode):
+                            # Pipes, sockets and devices have no contents to copy; opening a pipe would block.
+                            worker.progress.emit(f"Skipping '{entry.path}': not a regular file")
+                            continue
+                        files.append((entry.name, st))
+                    except OSError as e:
+                        worker.progress.emit(f"Error reading '{entry.path}': {e}")
+        except OSError as e:
+            worker.progress.emit(f"Error scanning '{dir_path}': {e}")
+            return [], []
+        if dir_cache:
+            dir_cache.listed(rel_dir, mtime_ns, [name for name, _ in files], subdirs)
 
-        files_to_copy = []
-        for dirpath, _, filenames in os.walk(source_dir):
+    files.sort(key=lambda item: item[0])
+    children = [(os.path.join(rel_dir, name), subdir_mtimes.get(name)) for name in sorted(subdirs)]
+    return files, children
+
+def scan_source_tree(worker, source_dir, concurrency=SCAN_THREADS, dir_cache=None, ahead=SCAN_AHEAD):
+    root = os.fspath(source_dir)
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+    try:
+        root_mtime_ns = None
+        if dir_cache:
+            try:
+                root_mtime_ns = os.stat(root).st_mtime_ns
+            except OSError:
+                pass
+        # Depth-first stack of [rel_dir, mtime_ns, future]; only the next `ahead` directories are being listed.
+        pending = [["", root_mtime_ns, None]]
+        in_flight = 0
+        while pending:
             if worker.is_cancellation_requested():
-                break
-            for filename in filenames:
-                if worker.is_cancellation_requested():
+                return
+            for item in reversed(pending):
+                if in_flight >= ahead:
                     break
-                source_file_path = Path(dirpath) / filename
-                relative_path = source_file_path.relative_to(source_dir)
-                for dest_dir in dest_dirs:
-                    dest_file_path = dest_dir / relative_path
+                if item[2] is None:
+                    item[2] = executor.submit(_scan_directory, worker, root, item[0], dir_cache, item[1])
+                    in_flight += 1
+            rel_dir, _, future = pending.pop()
+            in_flight -= 1
+            files, children = future.result()
+            yield rel_dir, files
+            pending.extend([child_dir, mtime_ns, None] for child_dir, mtime_ns in reversed(children))
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
 
-                    should_copy = True
-                    if dest_file_path.exists():
-                        if source_file_path.stat().st_mtime <= dest_file_path.stat().st_mtime:
-                            should_copy = False
+def list_directory(path):
+    try:
+        with os.scandir(path) as entries:
+            return {entry.name: entry for entry in entries}
+    except OSError:
+        return {}
 
-                    if should_copy:
-                        files_to_copy.append((source_file_path, dest_file_path))
+# --- Path Storage ---
 
-        if worker.is_cancellation_requested():
-            worker.progress.emit("Scan cancelled.")
+class PathTable:
+    # Append-only path list for structures that grow with the file count: each directory is stored once, and
+    # names are packed into one shared buffer instead of living on as separate string objects.
+    def __init__(self):
+        self._dirs = []
+        self._dir_ids = {}
+        self._dir_column = array("I")
+        self._names = bytearray()
+        self._name_ends = array("Q")
+
+    def __len__(self):
+        return len(self._dir_column)
+
+    def add(self, path):
+        dir_path, name = os.path.split(path)
+        dir_id = self._dir_ids.get(dir_path)
+        if dir_id is None:
+            dir_id = self._dir_ids[dir_path] = len(self._dirs)
+            self._dirs.append(dir_path)
+        self._dir_column.append(dir_id)
+        self._names += os.fsencode(name)
+        self._name_ends.append(len(self._names))
+        return len(self._dir_column) - 1
+
+    def __getitem__(self, index):
+        start = self._name_ends[index - 1] if index else 0
+        name = os.fsdecode(bytes(self._names[start:self._name_ends[index]]))
+        return os.path.join(self._dirs[self._dir_column[index]], name)
+
+def _inode_key(st):
+    return st.st_dev << 64 | st.st_ino
+
+# --- Change Detection ---
+
+HASH_THREADS = 4
+HASH_CACHE_MAX_ENTRIES = 5_000_000
+HASH_CACHE_MAX_AGE = 90 * 24 * 3600
+HASH_CACHE_BATCH = 1000
+FINGERPRINT_BLOCK_SIZE = 64 * 1024
+
+def state_dir():
+    if os.name == "nt":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, "pysync")
+
+def hash_file(path):
+    digest = hashlib.blake2b()
+    buffer = bytearray(COPY_CHUNK_SIZE)
+    view = memoryview(buffer)
+    with open(path, "rb", buffering=0) as f:
+        while True:
+            length = f.readinto(buffer)
+            if not length:
+                return digest.digest()
+            digest.update(view[:length])
+
+class HashCache:
+    def __init__(self, path=None):
+        path = path or os.path.join(state_dir(), "hash_cache.sqlite3")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, timeout=30)
+        self._db.execute("CREATE TABLE IF NOT EXISTS hashes (dev INTEGER, ino INTEGER, size INTEGER, "
+                         "mtime_ns INTEGER, digest BLOB, last_used INTEGER, PRIMARY KEY (dev, ino))")
+        self._db.execute("CREATE INDEX IF NOT EXISTS hashes_last_used ON hashes (last_used)")
+        self._now = int(time.time())
+        self._stored = []
+        self._used = []
+
+    def get(self, st):
+        # Some filesystems (and Windows DirEntry stats) report no inode; those files are always rehashed.
+        if not st.st_ino:
+            return None
+        row = self._db.execute("SELECT size, mtime_ns, digest FROM hashes WHERE dev = ? AND ino = ?",
+                               (st.st_dev, st.st_ino)).fetchone()
+        if row is None or row[0] != st.st_size or row[1] != st.st_mtime_ns:
+            return None
+        self._used.append((self._now, st.st_dev, st.st_ino))
+        if len(self._used) >= HASH_CACHE_BATCH:
+            self.flush()
+        return row[2]
+
+    def put(self, st, digest):
+        if not st.st_ino:
             return
+        self._stored.append((st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns, digest, self._now))
+        if len(self._stored) >= HASH_CACHE_BATCH:
+            self.flush()
 
-        worker.total_files.emit(len(files_to_copy))
+    def flush(self):
+        with self._db:
+            self._db.executemany("INSERT OR REPLACE INTO hashes VALUES (?, ?, ?, ?, ?, ?)", self._stored)
+            self._db.executemany("UPDATE hashes SET last_used = ? WHERE dev = ? AND ino = ?", self._used)
+        self._stored.clear()
+        self._used.clear()
 
-        if dry_run:
-            worker.progress.emit("--- DRY RUN MODE ENABLED ---")
-            for src, dest in files_to_copy:
-                if worker.is_cancellation_requested():
-                    break
-                worker.progress.emit(f"Will copy '{src.name}' to '{dest.parent}'")
-                worker.file_copied.emit()
-            worker.progress.emit("--- DRY RUN MODE CONCLUDED ---")
+    def evict(self):
+        with self._db:
+            self._db.execute("DELETE FROM hashes WHERE last_used < ?", (self._now - HASH_CACHE_MAX_AGE,))
+            self._db.execute("DELETE FROM hashes WHERE rowid IN (SELECT rowid FROM hashes "
+                             "ORDER BY last_used DESC LIMIT -1 OFFSET ?)", (HASH_CACHE_MAX_ENTRIES,))
+
+    def close(self):
+        try:
+            self.flush()
+            self.evict()
+        finally:
+            self._db.close()
+
+def fingerprint_file(path, size):
+    # Size plus head, middle and tail blocks: catches truncation, appends and most in-place edits for a few reads.
+    digest = hashlib.blake2b(size.to_bytes(8, "little"), digest_size=16)
+    with open(path, "rb", buffering=0) as f:
+        if size <= 3 * FINGERPRINT_BLOCK_SIZE:
+            digest.update(f.read(size))
+            return digest.digest()
+        for offset in (0, (size - FINGERPRINT_BLOCK_SIZE) // 2, size - FINGERPRINT_BLOCK_SIZE):
+            f.seek(offset)
+            digest.update(f.read(FINGERPRINT_BLOCK_SIZE))
+    return digest.digest()
+
+def _hash_or_none(path):
+    try:
+        return hash_file(path)
+    except OSError:
+        return None
+
+def _fingerprint_or_none(path, size):
+    try:
+        return fingerprint_file(path, size)
+    except OSError:
+        return None
+
+class ContentComparer:
+    def __init__(self, cache=None, threads=HASH_THREADS, full_hash=True):
+        self.cache = cache
+        self.full_hash = full_hash
+        self._pool = ThreadPoolExecutor(max_workers=threads)
+
+    def changed(self, pairs):
+        results = [None] * len(pairs)
+        pending = []
+        for index, (_, st, _, dest_st) in enumerate(pairs):
+            if self.cache and self.full_hash:
+                source_digest = self.cache.get(st)
+                dest_digest = self.cache.get(dest_st)
+                if source_digest is not None and dest_digest is not None:
+                    results[index] = source_digest != dest_digest
+                    continue
+            pending.append(index)
+        if not pending:
+            return results
+
+        # Fingerprints are cheap enough to skip caching; a mismatch settles the pair without a full read.
+        files = {}
+        for index in pending:
+            source_file, st, dest_file, dest_st = pairs[index]
+            files[source_file] = st
+            files[dest_file] = dest_st
+        paths = list(files)
+        fingerprints = dict(zip(paths, self._pool.map(lambda path: _fingerprint_or_none(path, files[path].st_size),
+                                                      paths)))
+        survivors = []
+        for index in pending:
+            source_file, _, dest_file, _ = pairs[index]
+            if fingerprints[source_file] is None or fingerprints[source_file] != fingerprints[dest_file]:
+                results[index] = True
+            elif self.full_hash:
+                survivors.append(index)
+            else:
+                results[index] = False
+        if survivors:
+            digests = self.digests({path: files[path] for index in survivors
+                                    for path in (pairs[index][0], pairs[index][2])})
+            for index in survivors:
+                source_file, _, dest_file, _ = pairs[index]
+                results[index] = digests[source_file] is None or digests[source_file] != digests[dest_file]
+        return results
+
+    def digests(self, files):
+        digests = {path: self.cache.get(st) if self.cache else None for path, st in files.items()}
+        missing = [path for path, digest in digests.items() if digest is None]
+        for path, digest in zip(missing, self._pool.map(_hash_or_none, missing)):
+            digests[path] = digest
+            if digest is not None and self.cache:
+                self.cache.put(files[path], digest)
+        return digests
+
+    def close(self):
+        self._pool.shutdown()
+        if self.cache:
+            self.cache.close()
+
+def open_comparer(worker, compare_mode):
+    if compare_mode == "fingerprint":
+        return ContentComparer(full_hash=False)
+    if compare_mode != "checksum":
+        return None
+    try:
+        cache = HashCache()
+    except (OSError, sqlite3.Error) as e:
+        worker.progress.emit(f"Hash cache unavailable, hashing every candidate file: {e}")
+        cache = None
+    return ContentComparer(cache)
+
+def open_touch_comparer():
+    # For mtime mode, which reads no content otherwise: only same-size pairs with a newer source get fingerprinted.
+    return ContentComparer(full_hash=False, threads=2)
+
+# --- Manifest ---
+
+MANIFEST_BATCH = 10000
+
+def manifest_path(source_dir, dest_dirs):
+    # One manifest per sync configuration, which is what a saved profile describes.
+    key = "\0".join([os.path.abspath(source_dir), *sorted(os.path.abspath(d) for d in dest_dirs)])
+    name = hashlib.blake2b(key.encode("utf-8", "surrogateescape"), digest_size=16).hexdigest()
+    return os.path.join(state_dir(), "manifests", f"{name}.sqlite3")
+
+class Manifest:
+    # Source files last seen fully in sync with every destination, keyed by directory so lookups stay per-listing.
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS files (dir TEXT, name TEXT, size INTEGER, mtime_ns INTEGER, "
+                         "ino INTEGER, PRIMARY KEY (dir, name)) WITHOUT ROWID")
+        self._db.execute("CREATE TABLE IF NOT EXISTS dirs (dir TEXT PRIMARY KEY, mtime_ns INTEGER, listing TEXT) "
+                         "WITHOUT ROWID")
+        self._db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self._stored = []
+        self._removed = []
+        self._stored_dirs = []
+        self._seen_dirs = set()
+
+    def lookup(self, rel_dir):
+        self._seen_dirs.add(rel_dir)
+        rows = self._db.execute("SELECT name, size, mtime_ns, ino FROM files WHERE dir = ?", (rel_dir,))
+        return {name: (size, mtime_ns, ino) for name, size, mtime_ns, ino in rows}
+
+    def record(self, rel_dir, name, st):
+        self._stored.append((rel_dir, name, st.st_size, st.st_mtime_ns, st.st_ino))
+        if len(self._stored) >= MANIFEST_BATCH:
+            self.flush()
+
+    def forget(self, rel_dir, names):
+        self._removed.extend((rel_dir, name) for name in names)
+        if len(self._removed) >= MANIFEST_BATCH:
+            self.flush()
+
+    def load_directories(self):
+        return {rel_dir: (mtime_ns, listing)
+                for rel_dir, mtime_ns, listing in self._db.execute("SELECT dir, mtime_ns, listing FROM dirs")}
+
+    def record_directories(self, rows):
+        self._stored_dirs.extend(rows)
+        if len(self._stored_dirs) >= MANIFEST_BATCH:
+            self.flush()
+
+    def get_meta(self, key):
+        row = self._db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key, value):
+        with self._db:
+            self._db.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, str(value)))
+
+    def flush(self):
+        with self._db:
+            self._db.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?)", self._stored)
+            self._db.executemany("DELETE FROM files WHERE dir = ? AND name = ?", self._removed)
+            self._db.executemany("INSERT OR REPLACE INTO dirs VALUES (?, ?, ?)", self._stored_dirs)
+        self._stored.clear()
+        self._removed.clear()
+        self._stored_dirs.clear()
+
+    def clear_files(self):
+        self._stored.clear()
+        self._removed.clear()
+        with self._db:
+            self._db.execute("DELETE FROM files")
+
+    def prune(self, visited_dirs=None):
+        # Only valid after a complete scan: directories never looked up no longer hold files in the source.
+        self.flush()
+        gone = [(rel_dir,) for rel_dir, in self._db.execute("SELECT DISTINCT dir FROM files")
+                if rel_dir not in self._seen_dirs]
+        with self._db:
+            self._db.executemany("DELETE FROM files WHERE dir = ?", gone)
+        if visited_dirs is not None:
+            gone = [(rel_dir,) for rel_dir, in self._db.execute("SELECT dir FROM dirs") if rel_dir not in visited_dirs]
+            with self._db:
+                self._db.executemany("DELETE FROM dirs WHERE dir = ?", gone)
+
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            self._db.close()
+
+def _manifest_entry(st):
+    return st.st_size, st.st_mtime_ns, st.st_ino
+
+# Trade-off of pruning: a directory's mtime changes when names are added, removed or renamed in it, but not when a
+# file inside is edited in place. Files already in the manifest under an unchanged directory are therefore not
+# stat'ed at all, and in-place edits to them go unnoticed until the next full verification scan.
+FULL_VERIFY_INTERVAL = 7 * 24 * 3600
+# Listings younger than this are not cached: a change in the same timestamp tick would leave the mtime as it was.
+DIR_MTIME_SLACK_NS = 2 * 1_000_000_000
+
+class DirectoryCache:
+    def __init__(self, listings):
+        self._listings = listings
+        self._lock = threading.Lock()
+        self._updates = []
+        self.visited = set()
+
+    def cached(self, rel_dir, mtime_ns):
+        with self._lock:
+            self.visited.add(rel_dir)
+        entry = self._listings.get(rel_dir)
+        if entry is None or mtime_ns is None or entry[0] != mtime_ns:
+            return None
+        return json.loads(entry[1])
+
+    def listed(self, rel_dir, mtime_ns, names, subdirs):
+        if mtime_ns is None or time.time_ns() - mtime_ns < DIR_MTIME_SLACK_NS:
             return
+        entry = self._listings.get(rel_dir)
+        if entry is not None and entry[0] == mtime_ns:
+            return
+        with self._lock:
+            self._updates.append((rel_dir, mtime_ns, json.dumps([names, subdirs])))
+
+    def take_updates(self):
+        with self._lock:
+            updates, self._updates = self._updates, []
+        return updates
+
+def open_manifest(worker, source_dir, dest_dirs, compare_mode="mtime"):
+    try:
+        manifest = Manifest(manifest_path(source_dir, dest_dirs))
+        # "In sync" only means what the compare mode that recorded it checked, so a switch starts the files over.
+        if manifest.get_meta("compare_mode") != compare_mode:
+            manifest.clear_files()
+            manifest.set_meta("compare_mode", compare_mode)
+        return manifest
+    except (OSError, sqlite3.Error) as e:
+        worker.progress.emit(f"Manifest unavailable, scanning without it: {e}")
+        return None
 
-        worker.progress.emit(f"Found {len(files_to_copy)} files to copy. Starting...")
+# --- Move Detection ---
+
+MOVE_MIN_SIZE = 1024 * 1024
+# Linked names stay safe to update: a destination with more than one name is always replaced, never rewritten.
+MOVE_ACTION = "link"
+
+def _index_tree(root, min_size):
+    # (size, mtime_ns) -> path id, or a list of ids when several files share the key.
+    index = {}
+    paths = PathTable()
+    pending = [root]
+    while pending:
+        try:
+            entries = list(os.scandir(pending.pop()))
+        except OSError:
+            continue
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    st = entry.stat(follow_symlinks=False)
+                    if st.st_size >= min_size:
+                        key = (st.st_size, st.st_mtime_ns)
+                        path_id = paths.add(entry.path)
+                        ids = index.get(key)
+                        if ids is None:
+                            index[key] = path_id
+                        elif isinstance(ids, list):
+                            ids.append(path_id)
+                        else:
+                            index[key] = [ids, path_id]
+            except OSError:
+                continue
+    return index, paths
+
+class MoveDetector:
+    def __init__(self, source_root, dest_roots, comparer=None, action=MOVE_ACTION):
+        self.source_root = os.fspath(source_root)
+        self.action = action
+        self._indexes = dict.fromkeys(os.fspath(d) for d in dest_roots)
+        self._claimed = set()
+        self._owns_comparer = comparer is None
+        self.comparer = comparer or ContentComparer(full_hash=False, threads=2)
+
+    def find(self, source_file, st, dest_root):
+        if st.st_size < MOVE_MIN_SIZE:
+            return None
+        if self._indexes[dest_root] is None:
+            # Built on first use only, so trees without new large files never pay for the extra walk.
+            self._indexes[dest_root] = _index_tree(dest_root, MOVE_MIN_SIZE)
+        index, paths = self._indexes[dest_root]
+        ids = index.get((st.st_size, st.st_mtime_ns))
+        if ids is None:
+            return None
+        for candidate_id in ids if isinstance(ids, list) else (ids,):
+            candidate = paths[candidate_id]
+            if candidate in self._claimed:
+                continue
+            if self.action == "rename":
+                # Renaming away a file whose source still exists would only get it copied back next time.
+                if os.path.lexists(os.path.join(self.source_root, os.path.relpath(candidate, dest_root))):
+                    continue
+            try:
+                # Stat results are not kept in the index, so the candidate is looked at again here.
+                candidate_st = os.stat(candidate)
+            except OSError:
+                continue
+            if not self.comparer.changed([(source_file, st, candidate, candidate_st)])[0]:
+                if self.action == "rename":
+                    self._claimed.add(candidate)
+                return candidate
+        return None
+
+    def close(self):
+        if self._owns_comparer:
+            self.comparer.close()
+
+# --- Planning ---
+
+def _metadata_differs(st, dest_st):
+    return st.st_mtime_ns != dest_st.st_mtime_ns or stat.S_IMODE(st.st_mode) != stat.S_IMODE(dest_st.st_mode)
+
+def plan_copies(worker, source_dir, dest_dirs, scan_threads=SCAN_THREADS, comparer=None, mover=None, manifest=None,
+                dir_cache=None, tree=None, touch_comparer=None):
+    source_root = os.fspath(source_dir)
+    dest_roots = [os.fspath(d) for d in dest_dirs]
+    # Inode key -> id in link_paths of the first source name seen for a multiply-linked file.
+    link_origins = {}
+    link_paths = PathTable()
+    if tree is None:
+        tree = scan_source_tree(worker, source_root, scan_threads, dir_cache)
+    for rel_dir, files in tree:
+        if dir_cache:
+            manifest.record_directories(dir_cache.take_updates())
+        if not files:
+            continue
+        if manifest:
+            known = manifest.lookup(rel_dir)
+            gone = known.keys() - {name for name, _ in files}
+            if gone:
+                manifest.forget(rel_dir, gone)
+            changed = []
+            for name, st in files:
+                if st is None:
+                    # From a pruned directory: trust the manifest for files it has, stat only the rest.
+                    if name in known:
+                        continue
+                    try:
+                        st = os.stat(os.path.join(source_root, rel_dir, name))
+                    except OSError:
+                        continue
+                if known.get(name) != _manifest_entry(st):
+                    changed.append((name, st))
+                elif st.st_nlink > 1 and st.st_ino and _inode_key(st) not in link_origins:
+                    link_origins[_inode_key(st)] = link_paths.add(os.path.join(rel_dir, name))
+            files = changed
+            # Nothing changed here since every destination was last verified: skip listing them at all.
+            if not files:
+                continue
+        source_parent = os.path.join(source_root, rel_dir)
+        dest_parents = [os.path.join(d, rel_dir) for d in dest_roots]
+        dest_listings = [list_directory(dest_parent) for dest_parent in dest_parents]
+        planned = []
+        content_checks = []
+        link_targets = {}
+        for name, st in files:
+            source_file = os.path.join(source_parent, name)
+            dest_files = []
+            actions = []
+            origin_rel = None
+            if st.st_nlink > 1 and st.st_ino:
+                rel_path = os.path.join(rel_dir, name)
+                origin_id = link_origins.get(_inode_key(st))
+                if origin_id is None:
+                    link_origins[_inode_key(st)] = link_paths.add(rel_path)
+                elif link_paths[origin_id] != rel_path:
+                    origin_rel = link_paths[origin_id]
+            for dest_root, dest_parent, dest_listing in zip(dest_roots, dest_parents, dest_listings):
+                dest_file = os.path.join(dest_parent, name)
+                dest_entry = dest_listing.get(name)
+                if origin_rel is not None:
+                    link_targets[dest_file] = os.path.join(dest_root, origin_rel)
+                elif dest_entry is None and mover:
+                    origin = mover.find(source_file, st, dest_root)
+                    if origin:
+                        actions.append((mover.action, dest_file, origin))
+                        continue
+                if dest_entry is not None:
+                    try:
+                        dest_st = dest_entry.stat()
+                        if comparer is None:
+                            if st.st_mtime <= dest_st.st_mtime:
+                                continue
+                            # Same size but newer: often only touched, which a quick fingerprint tells apart.
+                            if touch_comparer and st.st_size == dest_st.st_size:
+                                content_checks.append((len(planned), (source_file, st, dest_file, dest_st)))
+                        elif st.st_size == dest_st.st_size:
+                            content_checks.append((len(planned), (source_file, st, dest_file, dest_st)))
+                    except OSError:
+                        pass
+                dest_files.append(dest_file)
+            planned.append((source_file, dest_files, st.st_size, actions))
+
+        if content_checks:
+            changed = (comparer or touch_comparer).changed([pair for _, pair in content_checks])
+            for (index, (_, st, dest_file, dest_st)), is_changed in zip(content_checks, changed):
+                if not is_changed:
+                    planned[index][1].remove(dest_file)
+                    # Same bytes, different timestamps or permissions (a restore or a touch): fix the metadata only.
+                    if _metadata_differs(st, dest_st):
+                        planned[index][3].append(("metadata", dest_file, None))
+
+        for (name, st), (source_file, dest_files, size, actions) in zip(files, planned):
+            if link_targets:
+                # Later names of a hard-linked source file are linked to the first name's copy, not copied again.
+                for dest_file in [dest_file for dest_file in dest_files if dest_file in link_targets]:
+                    dest_files.remove(dest_file)
+                    actions.append(("hardlink", dest_file, link_targets[dest_file]))
+            if dest_files or actions:
+                yield source_file, dest_files, size, actions
+            elif manifest:
+                manifest.record(rel_dir, name, st)
+
+# --- Pipeline ---
+
+PLAN_QUEUE_SIZE = 10000
+PROGRESS_INTERVAL = 0.2
+_PLAN_DONE = object()
+
+def _put_until_cancelled(worker, plan_queue, item):
+    while not worker.is_cancellation_requested():
+        try:
+            plan_queue.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+def iter_plan_queue(worker, plan_queue):
+    while not worker.is_cancellation_requested():
+        try:
+            item = plan_queue.get(timeout=0.1)
+        except queue.Empty:
+            continue
+        if item is _PLAN_DONE:
+            return
+        yield item
+
+PLAN_ACTION_LABELS = {
+    "metadata": "to update metadata only",
+    "link": "to hard-link from files already in the destination",
+    "rename": "to rename within the destination",
+    "hardlink": "to recreate as hard links",
+}
+
+def produce_plan(worker, source_dir, dest_dirs, plan_queue, errors, compare_mode, detect_moves, incremental,
+                 prune_dirs):
+    planned = 0
+    planned_bytes = 0
+    planned_actions = dict.fromkeys(PLAN_ACTION_LABELS, 0)
+    last_report = time.monotonic()
+    comparer = None
+    touch_comparer = None
+    mover = None
+    manifest = None
+    dir_cache = None
+    full_scan = False
+    try:
+        comparer = open_comparer(worker, compare_mode)
+        if comparer is None:
+            touch_comparer = open_touch_comparer()
+        if detect_moves:
+            mover = MoveDetector(source_dir, dest_dirs, comparer or touch_comparer)
+        if incremental or prune_dirs:
+            manifest = open_manifest(worker, source_dir, dest_dirs, compare_mode)
+        if prune_dirs and manifest:
+            last_full_scan = manifest.get_meta("last_full_scan")
+            full_scan = last_full_scan is None or time.time() - float(last_full_scan) >= FULL_VERIFY_INTERVAL
+            if full_scan:
+                worker.progress.emit("Running a full verification scan; unchanged folders are skipped on later runs.")
+            dir_cache = DirectoryCache({} if full_scan else manifest.load_directories())
+        for item in plan_copies(worker, source_dir, dest_dirs, comparer=comparer, mover=mover, manifest=manifest,
+                                dir_cache=dir_cache, touch_comparer=touch_comparer):
+            if not _put_until_cancelled(worker, plan_queue, item):
+                return
+            _, dest_files, size, actions = item
+            planned += len(dest_files)
+            planned_bytes += size * len(dest_files)
+            for action, _, _ in actions:
+                planned_actions[action] += 1
+            now = time.monotonic()
+            if now - last_report >= PROGRESS_INTERVAL:
+                worker.total_files.emit(planned + sum(planned_actions.values()))
+                worker.total_bytes.emit(planned_bytes)
+                last_report = now
+        if not worker.is_cancellation_requested():
+            if manifest:
+                manifest.prune(dir_cache.visited if dir_cache else None)
+                if full_scan:
+                    manifest.set_meta("last_full_scan", time.time())
+            worker.total_files.emit(planned + sum(planned_actions.values()))
+            worker.total_bytes.emit(planned_bytes)
+            worker.scan_finished.emit()
+            message = f"Scan complete: {planned} files ({format_bytes(planned_bytes)}) to copy"
+            for action, count in planned_actions.items():
+                if count:
+                    message += f", {count} {PLAN_ACTION_LABELS[action]}"
+            worker.progress.emit(message + ".")
+    except Exception as e:
+        errors.append(e)
+    finally:
+        if manifest:
+            manifest.close()
+        if mover:
+            mover.close()
+        if comparer:
+            comparer.close()
+        if touch_comparer:
+            touch_comparer.close()
+        _put_until_cancelled(worker, plan_queue, _PLAN_DONE)
+
+def start_plan_producer(worker, source_dir, dest_dirs, compare_mode="mtime", detect_moves=False, incremental=False,
+                        prune_dirs=False):
+    plan_queue = queue.Queue(maxsize=PLAN_QUEUE_SIZE)
+    errors = []
+    producer = threading.Thread(target=produce_plan,
+                                args=(worker, source_dir, dest_dirs, plan_queue, errors, compare_mode, detect_moves,
+                                      incremental, prune_dirs),
+                                name="PySync-planner", daemon=True)
+    producer.start()
+    return producer, plan_queue, errors
+
+# --- Statistics ---
+
+def format_bytes(size):
+    for unit in ("B", "KB", "MB", "GB", "TB"):
+        if abs(size) < 1024 or unit == "TB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+def format_duration(seconds):
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02}:{seconds:02}"
+
+class ByteMeter:
+    def __init__(self, emit, interval=PROGRESS_INTERVAL):
+        self._emit = emit
+        self._interval = interval
+        self._lock = threading.Lock()
+        self._total = 0
+        self._last_emit = time.monotonic()
+
+    def add(self, count):
+        with self._lock:
+            self._total += count
+            now = time.monotonic()
+            if now - self._last_emit < self._interval:
+                return
+            self._last_emit = now
+            total = self._total
+        self._emit(total)
+
+    def flush(self):
+        with self._lock:
+            total = self._total
+        self._emit(total)
+
+class SyncStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.files_copied = 0
+        self.bytes_copied = 0
+        self.bytes_cloned = 0
+        self.sparse_bytes_skipped = 0
+        self.delta_bytes_reused = 0
+        self.metadata_fixed = 0
+        self.files_relocated = 0
+        self.links_preserved = 0
+        self.bytes_shared = 0
+        self.errors = 0
+
+    def add(self, **counts):
+        with self._lock:
+            for name, value in counts.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def summary(self):
+        lines = [f"Copied {self.files_copied} files ({format_bytes(self.bytes_copied)} written)."]
+        if self.bytes_cloned:
+            lines.append(f"Cloned {format_bytes(self.bytes_cloned)} with reflinks instead of copying.")
+        if self.bytes_shared:
+            lines.append(f"Shared {format_bytes(self.bytes_shared)} between destinations on the same disk "
+                         "instead of writing it again.")
+        if self.delta_bytes_reused:
+            lines.append(f"Delta transfer reused {format_bytes(self.delta_bytes_reused)} already in the destinations.")
+        if self.sparse_bytes_skipped:
+            lines.append(f"Skipped {format_bytes(self.sparse_bytes_skipped)} of sparse-file holes.")
+        if self.metadata_fixed:
+            lines.append(f"Updated metadata of {self.metadata_fixed} unchanged files without copying.")
+        if self.files_relocated:
+            lines.append(f"Linked or renamed {self.files_relocated} files already in the destinations instead of copying.")
+        if self.links_preserved:
+            lines.append(f"Recreated {self.links_preserved} source hard links instead of copying the data again.")
+        if self.errors:
+            lines.append(f"{self.errors} copies failed.")
+        return lines
+
+# --- Copy Engine ---
+
+COPY_CHUNK_SIZE = 1024 * 1024
+FANOUT_BUFFERS = 8
+
+def _write_all(fd, data):
+    while data:
+        data = data[os.write(fd, data):]
+
+def _open_dest(dest_file, source_st):
+    fd = os.open(dest_file, os.O_WRONLY | os.O_CREAT | getattr(os, "O_BINARY", 0), 0o666)
+    try:
+        dest_st = os.fstat(fd)
+        if (dest_st.st_dev, dest_st.st_ino) == (source_st.st_dev, source_st.st_ino):
+            raise shutil.SameFileError(f"'{dest_file}' is the source file")
+        os.ftruncate(fd, 0)
+    except BaseException:
+        os.close(fd)
+        raise
+    return fd, dest_st.st_dev
+
+FICLONE = 0x40049409
+_NO_REFLINK_ERRNOS = {errno.EXDEV, errno.ENOTSUP, errno.EOPNOTSUPP, errno.ENOTTY, errno.ENOSYS}
+_reflink_pairs = {}
+
+def _try_reflink(source_fd, source_dev, dest_fd, dest_dev):
+    if fcntl is None or not sys.platform.startswith("linux"):
+        return False
+    pair = (source_dev, dest_dev)
+    if _reflink_pairs.get(pair) is False:
+        return False
+    try:
+        fcntl.ioctl(dest_fd, FICLONE, source_fd)
+    except OSError as e:
+        # Only remember failures that are about the filesystem pair, not this particular file.
+        if e.errno in _NO_REFLINK_ERRNOS:
+            _reflink_pairs[pair] = False
+        return False
+    _reflink_pairs[pair] = True
+    return True
+
+KERNEL_COPY_CHUNK = 16 * 1024 * 1024
+COPY_BACKENDS = ("reflink", "copy_file_range", "sendfile", "userspace")
+_FALLBACK_ERRNOS = {errno.ENOSYS, errno.EXDEV, errno.EINVAL, errno.EBADF, errno.ENOTSUP,
+                    errno.EOPNOTSUPP, errno.ENOTSOCK}
+
+def _copy_file_range(source_fd, dest_fd, offset):
+    return os.copy_file_range(source_fd, dest_fd, KERNEL_COPY_CHUNK, offset, offset)
+
+def _sendfile(source_fd, dest_fd, offset):
+    return os.sendfile(dest_fd, source_fd, offset, KERNEL_COPY_CHUNK)
+
+_KERNEL_COPIES = {}
+if hasattr(os, "copy_file_range"):
+    _KERNEL_COPIES["copy_file_range"] = _copy_file_range
+if hasattr(os, "sendfile") and sys.platform.startswith("linux"):
+    _KERNEL_COPIES["sendfile"] = _sendfile
+
+def _ignore_progress(count):
+    pass
+
+def _copy_kernel(kernel_copy, source_fd, dest_fd, offset, size, progress):
+    # sendfile writes at the destination's file position, copy_file_range at explicit offsets.
+    os.lseek(dest_fd, offset, os.SEEK_SET)
+    try:
+        while True:
+            copied = kernel_copy(source_fd, dest_fd, offset)
+            if not copied:
+                # Some filesystems (procfs, FUSE) report EOF straight away instead of failing.
+                return offset, offset > 0 or size == 0
+            offset += copied
+            progress(copied)
+    except OSError as e:
+        if e.errno not in _FALLBACK_ERRNOS:
+            raise
+        return offset, False
+
+def _copy_userspace(source, dest_fd, offset, progress):
+    source.seek(offset)
+    os.lseek(dest_fd, offset, os.SEEK_SET)
+    buffer = bytearray(COPY_CHUNK_SIZE)
+    view = memoryview(buffer)
+    while True:
+        length = source.readinto(buffer)
+        if not length:
+            return
+        _write_all(dest_fd, view[:length])
+        progress(length)
+
+def _copy_to_fd(source, source_st, dest_fd, backends, progress):
+    offset = 0
+    for backend in backends:
+        if backend == "userspace":
+            _copy_userspace(source, dest_fd, offset, progress)
+            return backend
+        kernel_copy = _KERNEL_COPIES.get(backend)
+        if kernel_copy is not None:
+            offset, finished = _copy_kernel(kernel_copy, source.fileno(), dest_fd, offset, source_st.st_size,
+                                            progress)
+            if finished:
+                return backend
+    raise OSError(errno.ENOTSUP, f"No copy backend in {backends} could copy the file")
+
+if hasattr(os, "pwrite"):
+    _pwrite = os.pwrite
+else:
+    def _pwrite(fd, data, offset):
+        os.lseek(fd, offset, os.SEEK_SET)
+        return os.write(fd, data)
+
+def _pwrite_all(fd, data, offset):
+    while data:
+        written = _pwrite(fd, data, offset)
+        data = data[written:]
+        offset += written
+
+def _is_sparse(source_st):
+    return hasattr(os, "SEEK_DATA") and source_st.st_blocks * 512 < source_st.st_size
+
+def _data_extents(fd, size):
+    extents = []
+    offset = 0
+    while offset < size:
+        try:
+            start = os.lseek(fd, offset, os.SEEK_DATA)
+        except OSError as e:
+            if e.errno == errno.ENXIO:
+                break
+            if e.errno in _FALLBACK_ERRNOS and not extents:
+                return [(0, None)]
+            raise
+        offset = os.lseek(fd, start, os.SEEK_HOLE)
+        extents.append((start, offset))
+    return extents
+
+def _read_extents(source, extents, acquire, release):
+    for start, end in extents:
+        offset = start
+        source.seek(offset)
+        while end is None or offset < end:
+            buffer = acquire()
+            limit = COPY_CHUNK_SIZE if end is None else min(COPY_CHUNK_SIZE, end - offset)
+            length = source.readinto(memoryview(buffer)[:limit])
+            if not length:
+                release(buffer)
+                break
+            yield buffer, offset, length
+            offset += length
+
+def _fanout_serial(source, extents, dest_fds, errors, progress):
+    buffer = bytearray(COPY_CHUNK_SIZE)
+    copied = 0
+    for _, offset, length in _read_extents(source, extents, lambda: buffer, lambda _: None):
+        data = memoryview(buffer)[:length]
+        for dest_file, fd in dest_fds.items():
+            if errors[dest_file] is None:
+                try:
+                    _pwrite_all(fd, data, offset)
+                    progress(length)
+                except OSError as e:
+                    errors[dest_file] = e
+        copied += length
+    return copied
+
+def _fanout_threaded(source, extents, dest_fds, errors, progress):
+    free_buffers = queue.Queue()
+    for _ in range(FANOUT_BUFFERS):
+        free_buffers.put(bytearray(COPY_CHUNK_SIZE))
+    lanes = {dest_file: queue.Queue() for dest_file in dest_fds}
+    lock = threading.Lock()
+
+    def write_lane(dest_file, fd, lane):
+        while True:
+            chunk = lane.get()
+            if chunk is None:
+                return
+            buffer, offset, length, remaining = chunk
+            if errors[dest_file] is None:
+                try:
+                    _pwrite_all(fd, memoryview(buffer)[:length], offset)
+                    progress(length)
+                except OSError as e:
+                    errors[dest_file] = e
+            with lock:
+                remaining[0] -= 1
+                if not remaining[0]:
+                    free_buffers.put(buffer)
+
+    writers = [threading.Thread(target=write_lane, args=(dest_file, fd, lanes[dest_file]), daemon=True)
+               for dest_file, fd in dest_fds.items()]
+    for writer in writers:
+        writer.start()
+    copied = 0
+    try:
+        for buffer, offset, length in _read_extents(source, extents, free_buffers.get, free_buffers.put):
+            chunk = (buffer, offset, length, [len(lanes)])
+            for lane in lanes.values():
+                lane.put(chunk)
+            copied += length
+    finally:
+        for lane in lanes.values():
+            lane.put(None)
+        for writer in writers:
+            writer.join()
+    return copied
 
-        with ThreadPoolExecutor() as executor:
-            for _, dest_path in files_to_copy:
-                if not dest_path.parent.exists():
-                    dest_path.parent.mkdir(parents=True, exist_ok=True)
+RANGED_COPY_THRESHOLD = 1024 * 1024 * 1024
+RANGED_COPY_CHUNK = 64 * 1024 * 1024
+RANGED_COPY_WORKERS = 4
 
-            futures = {executor.submit(shutil.copy2, src, dest): src for src, dest in files_to_copy}
+def _use_ranged_copy(source_st):
+    return hasattr(os, "pread") and source_st.st_size >= RANGED_COPY_THRESHOLD
 
-            for future in as_completed(futures):
-                if worker.is_cancellation_requested():
-                    for f in futures:
-                        f.cancel()
+def _copy_range(source_fd, dest_fds, errors, start, end, kernel, progress):
+    offset = start
+    if kernel:
+        (_, fd), = dest_fds.items()
+        try:
+            while offset < end:
+                copied = os.copy_file_range(source_fd, fd, end - offset, offset, offset)
+                if not copied:
                     break
-                source_file = futures[future]
+                offset += copied
+                progress(copied)
+        except OSError as e:
+            if e.errno not in _FALLBACK_ERRNOS:
+                raise
+    while offset < end:
+        data = os.pread(source_fd, min(COPY_CHUNK_SIZE, end - offset), offset)
+        if not data:
+            break
+        for dest_file, fd in dest_fds.items():
+            if errors[dest_file] is None:
                 try:
-                    future.result()
-                    worker.progress.emit(f"Copied '{source_file.name}'")
-                    worker.file_copied.emit()
-                except Exception as e:
-                    if not isinstance(e, shutil.SameFileError):
-                        worker.progress.emit(f"Error copying '{source_file.name}': {e}")
+                    _pwrite_all(fd, data, offset)
+                    progress(len(data))
+                except OSError as e:
+                    errors[dest_file] = e
+        offset += len(data)
+    return offset - start
+
+def _copy_ranged(source, size, extents, dest_fds, errors, progress):
+    ranges = []
+    for start, end in extents:
+        end = size if end is None else end
+        ranges.extend((offset, min(offset + RANGED_COPY_CHUNK, end)) for offset in range(start, end, RANGED_COPY_CHUNK))
+    kernel = len(dest_fds) == 1 and "copy_file_range" in _KERNEL_COPIES
+    with ThreadPoolExecutor(max_workers=RANGED_COPY_WORKERS) as pool:
+        return sum(pool.map(lambda r: _copy_range(source.fileno(), dest_fds, errors, *r, kernel, progress), ranges))
+
+def _copy_extents(source, source_st, dest_fds, errors, progress):
+    sparse = _is_sparse(source_st)
+    extents = _data_extents(source.fileno(), source_st.st_size) if sparse else [(0, None)]
+    if _use_ranged_copy(source_st):
+        copied = _copy_ranged(source, source_st.st_size, extents, dest_fds, errors, progress)
+    elif len(dest_fds) == 1 or source_st.st_size <= COPY_CHUNK_SIZE:
+        copied = _fanout_serial(source, extents, dest_fds, errors, progress)
+    else:
+        copied = _fanout_threaded(source, extents, dest_fds, errors, progress)
+    if sparse:
+        # Holes after the last data extent only exist once the file has its full length.
+        for dest_file, fd in dest_fds.items():
+            if errors[dest_file] is None:
+                try:
+                    os.ftruncate(fd, source_st.st_size)
+                except OSError as e:
+                    errors[dest_file] = e
+    return copied
+
+def _remove_quietly(path):
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+def _temp_path(dest_file):
+    dest_parent, name = os.path.split(dest_file)
+    return os.path.join(dest_parent, f".{name}.pysync-{os.getpid()}.tmp")
+
+def _open_target(dest_file, source_st, atomic):
+    try:
+        dest_st = os.stat(dest_file)
+        if (dest_st.st_dev, dest_st.st_ino) == (source_st.st_dev, source_st.st_ino):
+            raise shutil.SameFileError(f"'{dest_file}' is the source file")
+        # Rewriting a file that has other names would change them too, so it is replaced instead.
+        atomic = atomic or dest_st.st_nlink > 1
+    except FileNotFoundError:
+        pass
+    if not atomic:
+        return dest_file, _open_dest(dest_file, source_st)
+    temp_file = _temp_path(dest_file)
+    return temp_file, _open_dest(temp_file, source_st)
+
+def _open_source(path, flags):
+    # Non-blocking, so a pipe that replaced a planned file is refused below instead of hanging the open.
+    return os.open(path, flags | getattr(os, "O_NONBLOCK", 0))
+
+def copy_fanout(source_file, dest_files, backends=COPY_BACKENDS, stats=None, progress=_ignore_progress):
+    results = {}
+    targets = {}
+    dest_fds = {}
+    try:
+        with open(source_file, "rb", buffering=0, opener=_open_source) as source:
+            source_st = os.fstat(source.fileno())
+            if not stat.S_ISREG(source_st.st_mode):
+                raise shutil.SpecialFileError(f"'{source_file}' is not a regular file")
+            size = source_st.st_size
+            # Large copies take long enough that the old destination should stay intact until the new one is whole.
+            atomic = _use_ranged_copy(source_st)
+            pending = {}
+            for dest_file in dest_files:
+                try:
+                    targets[dest_file], (fd, dest_dev) = _open_target(dest_file, source_st, atomic)
+                except OSError as e:
+                    results[dest_file] = (None, e)
+                    continue
+                dest_fds[dest_file] = fd
+                if "reflink" in backends and _try_reflink(source.fileno(), source_st.st_dev, fd, dest_dev):
+                    results[dest_file] = ("reflink", None)
+                    progress(size)
+                    if stats:
+                        stats.add(bytes_cloned=size)
+                else:
+                    pending[dest_file] = fd
+
+            sparse = _is_sparse(source_st)
+            if len(pending) == 1 and not sparse and not atomic:
+                (dest_file, fd), = pending.items()
+                try:
+                    results[dest_file] = (_copy_to_fd(source, source_st, fd, backends, progress), None)
+                    if stats:
+                        stats.add(bytes_copied=size)
+                except OSError as e:
+                    results[dest_file] = (None, e)
+            elif pending:
+                errors = dict.fromkeys(pending)
+                copied = _copy_extents(source, source_st, pending, errors, progress)
+                method = "ranged" if atomic else "sparse" if sparse else "fanout"
+                for dest_file, error in errors.items():
+                    if error is not None:
+                        results[dest_file] = (None, error)
+                        continue
+                    results[dest_file] = (method, None)
+                    if size > copied:
+                        # Holes are never read, but the planned total counts them, so they are reported as done.
+                        progress(size - copied)
+                    if stats:
+                        stats.add(bytes_copied=copied, sparse_bytes_skipped=max(size - copied, 0))
+    except OSError as e:
+        for dest_file in dest_files:
+            results.setdefault(dest_file, (None, e))
+    finally:
+        for fd in dest_fds.values():
+            os.close(fd)
+        for dest_file, target in targets.items():
+            if target != dest_file and results.get(dest_file, (None, True))[1] is not None:
+                _remove_quietly(target)
+
+    for dest_file, target in targets.items():
+        if results[dest_file][1] is None:
+            try:
+                shutil.copystat(source_file, target)
+                if target != dest_file:
+                    os.replace(target, dest_file)
+            except OSError as e:
+                results[dest_file] = (None, e)
+                if target != dest_file:
+                    _remove_quietly(target)
+    return [(dest_file, *results[dest_file]) for dest_file in dest_files]
+
+def copy_file(source_file, dest_file, backends=COPY_BACKENDS):
+    (_, method, error), = copy_fanout(source_file, [dest_file], backends)
+    if error is not None:
+        raise error
+    return method
+
+# --- Delta Transfer ---
+
+DELTA_THRESHOLD = 64 * 1024 * 1024
+DELTA_BLOCK_SIZE = 128 * 1024
+DELTA_MAX_BLOCKS = 1024 * 1024
+DELTA_MAX_LITERAL_RATIO = 0.5
+# Byte-by-byte searches for moved data allowed per unmatched run, in blocks. Rolling runs in Python, so it
+# is kept for regions where the data really shifted; in-place edits are found by comparing aligned blocks.
+DELTA_MAX_ROLL_BLOCKS = 4
+_ADLER_MOD = 65521
+
+def _roll_adler32(checksum, out_byte, in_byte, block_size):
+    a = ((checksum & 0xffff) - out_byte + in_byte) % _ADLER_MOD
+    b = ((checksum >> 16) - block_size * out_byte + a - 1) % _ADLER_MOD
+    return (b << 16) | a
+
+def _strong_checksum(block):
+    return hashlib.blake2b(block, digest_size=16).digest()
+
+def _block_signatures(dest_map, block_size):
+    signatures = {}
+    for offset in range(0, len(dest_map) - block_size + 1, block_size):
+        block = dest_map[offset:offset + block_size]
+        signatures.setdefault(zlib.adler32(block), []).append((offset, _strong_checksum(block)))
+    return signatures
+
+def _same_block(source_map, offset, dest_map, dest_offset, block_size):
+    return (offset + block_size <= len(source_map) and dest_offset + block_size <= len(dest_map)
+            and source_map[offset:offset + block_size] == dest_map[dest_offset:dest_offset + block_size])
+
+def _find_block(source_map, signatures, offset, block_size, weak):
+    candidates = signatures.get(weak)
+    if candidates:
+        strong = _strong_checksum(source_map[offset:offset + block_size])
+        return next((dest_offset for dest_offset, digest in candidates if digest == strong), None)
+    return None
+
+def _roll_search(source_map, signatures, start, end, block_size):
+    weak = zlib.adler32(source_map[start:start + block_size])
+    for offset in range(start, end):
+        match = _find_block(source_map, signatures, offset, block_size, weak)
+        if match is not None:
+            return offset, match
+        if offset + 1 < end:
+            weak = _roll_adler32(weak, source_map[offset], source_map[offset + block_size], block_size)
+    return None, None
+
+def _delta_ops(source_map, dest_map, block_size):
+    size = len(source_map)
+    dest_size = len(dest_map)
+    max_literal = size * DELTA_MAX_LITERAL_RATIO
+    signatures = None
+    literal_bytes = 0
+    ops = []
+    literal_start = 0
+    offset = 0
+    # Where the next source block is expected in the destination if nothing moved since the last match.
+    expected = 0
+    rolls = 0
+    while offset + block_size <= size:
+        match = None
+        if _same_block(source_map, offset, dest_map, expected, block_size):
+            match = expected
+        elif expected + block_size <= dest_size and (offset + 2 * block_size > size or _same_block(
+                source_map, offset + block_size, dest_map, expected + block_size, block_size)):
+            # Changed in place: the data after this block still lines up, so there is nothing to search for.
+            pass
+        elif expected + block_size <= dest_size:
+            if signatures is None:
+                signatures = _block_signatures(dest_map, block_size)
+            match = _find_block(source_map, signatures, offset, block_size,
+                                zlib.adler32(source_map[offset:offset + block_size]))
+            if match is None and rolls < DELTA_MAX_ROLL_BLOCKS:
+                rolls += 1
+                found, match = _roll_search(source_map, signatures, offset + 1,
+                                            min(offset + block_size, size - block_size + 1), block_size)
+                if match is not None:
+                    offset = found
+        if match is None:
+            # Past the destination's end the data is appended, and is copied without searching.
+            offset += block_size
+            expected += block_size
+            if literal_bytes + offset - literal_start > max_literal:
+                return None
+            continue
+        if literal_start < offset:
+            literal_bytes += offset - literal_start
+            ops.append(("copy", literal_start, offset))
+        last = ops[-1] if ops else None
+        if last and last[0] == "reuse" and last[1] + last[3] == offset and last[2] + last[3] == match:
+            ops[-1] = ("reuse", last[1], last[2], last[3] + block_size)
+        else:
+            ops.append(("reuse", offset, match, block_size))
+        offset += block_size
+        expected = match + block_size
+        literal_start = offset
+        rolls = 0
+    if literal_start < size:
+        if literal_bytes + size - literal_start > max_literal:
+            return None
+        ops.append(("copy", literal_start, size))
+    return ops
+
+def _write_delta_range(fd, data_map, start, end, offset, progress):
+    while start < end:
+        length = min(COPY_CHUNK_SIZE, end - start)
+        _pwrite_all(fd, data_map[start:start + length], offset)
+        progress(length)
+        start += length
+        offset += length
+
+def delta_copy(source_file, dest_file, progress=_ignore_progress):
+    temp_file = None
+    with open(source_file, "rb") as source, open(dest_file, "r+b") as dest:
+        source_st = os.fstat(source.fileno())
+        dest_st = os.fstat(dest.fileno())
+        if (dest_st.st_dev, dest_st.st_ino) == (source_st.st_dev, source_st.st_ino):
+            raise shutil.SameFileError(f"'{dest_file}' is the source file")
+        if not source_st.st_size or not dest_st.st_size:
+            return None
+        block_size = max(DELTA_BLOCK_SIZE, -(-dest_st.st_size // DELTA_MAX_BLOCKS))
+        with mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ) as source_map, \
+                mmap.mmap(dest.fileno(), 0, access=mmap.ACCESS_READ) as dest_map:
+            ops = _delta_ops(source_map, dest_map, block_size)
+            if ops is None:
+                return None
+            reused = sum(op[3] for op in ops if op[0] == "reuse")
+
+            if dest_st.st_nlink == 1 and all(op[0] == "copy" or op[1] == op[2] for op in ops):
+                # Every reused block is already in place, so only the changed ranges are written.
+                for op in ops:
+                    if op[0] == "copy":
+                        _write_delta_range(dest.fileno(), source_map, op[1], op[2], op[1], progress)
+                    else:
+                        progress(op[3])
+                dest_map.close()
+                dest.truncate(source_st.st_size)
+            else:
+                temp_file = _temp_path(dest_file)
+                fd, _ = _open_dest(temp_file, source_st)
+                try:
+                    for op in ops:
+                        if op[0] == "copy":
+                            _write_delta_range(fd, source_map, op[1], op[2], op[1], progress)
+                        else:
+                            _write_delta_range(fd, dest_map, op[2], op[2] + op[3], op[1], progress)
+                except BaseException:
+                    os.close(fd)
+                    _remove_quietly(temp_file)
+                    raise
+                os.close(fd)
+    if temp_file:
+        os.replace(temp_file, dest_file)
+    shutil.copystat(source_file, dest_file)
+    return reused
+
+def _link_over(origin, dest_file):
+    try:
+        os.link(origin, dest_file)
+    except FileExistsError:
+        if os.path.samefile(origin, dest_file):
+            return
+        temp_file = _temp_path(dest_file)
+        os.link(origin, temp_file)
+        try:
+            os.replace(temp_file, dest_file)
+        except OSError:
+            _remove_quietly(temp_file)
+            raise
+
+def _unlink_copy(source_file, dest_file):
+    # A destination that shares its inode with other names gets a private copy before its metadata changes.
+    # Names mirroring a hard-linked source group stay linked, since the change applies to all of them.
+    if os.stat(dest_file).st_nlink < 2 or os.stat(source_file).st_nlink > 1:
+        return
+    temp_file = _temp_path(dest_file)
+    try:
+        shutil.copyfile(dest_file, temp_file)
+        os.replace(temp_file, dest_file)
+    except BaseException:
+        _remove_quietly(temp_file)
+        raise
+
+def _apply_action(source_file, action, dest_file, origin):
+    if action == "metadata":
+        _unlink_copy(source_file, dest_file)
+        shutil.copystat(source_file, dest_file)
+    elif action in ("link", "hardlink"):
+        _link_over(origin, dest_file)
+    else:
+        os.rename(origin, dest_file)
+
+# "reflink" shares blocks copy-on-write; "hardlink" also works on filesystems without reflinks, but then the
+# destinations stay one file and an in-place update of either changes both. "off" writes every destination.
+DEST_DEDUP_POLICY = "reflink"
+
+def _clone_into(source_file, origin, dest_file):
+    temp_file = _temp_path(dest_file)
+    with open(origin, "rb", buffering=0) as f:
+        origin_st = os.fstat(f.fileno())
+        fd, dest_dev = _open_dest(temp_file, origin_st)
+        try:
+            cloned = _try_reflink(f.fileno(), origin_st.st_dev, fd, dest_dev)
+        finally:
+            os.close(fd)
+    if not cloned:
+        _remove_quietly(temp_file)
+        return False
+    try:
+        shutil.copystat(source_file, temp_file)
+        os.replace(temp_file, dest_file)
+    except OSError:
+        _remove_quietly(temp_file)
+        raise
+    return True
+
+def _share_copy(source_file, origin, dest_file, policy):
+    if policy == "hardlink":
+        _link_over(origin, dest_file)
+        return "shared-hardlink"
+    if policy == "reflink" and _clone_into(source_file, origin, dest_file):
+        return "shared-reflink"
+    return None
+
+def parent_device(path, parent_devices):
+    dest_parent = os.path.dirname(path)
+    dev = parent_devices.get(dest_parent)
+    if dev is None:
+        try:
+            dev = parent_devices[dest_parent] = os.stat(dest_parent).st_dev
+        except OSError:
+            return None
+    return dev
+
+def plan_shares(dest_files, parent_devices, policy=DEST_DEDUP_POLICY):
+    # The first destination on each device gets a real copy; the rest on that device share its blocks.
+    if policy == "off" or len(dest_files) < 2:
+        return None
+    primaries = {}
+    shares = {}
+    for dest_file in dest_files:
+        dev = parent_device(dest_file, parent_devices)
+        if dev is None:
+            continue
+        if policy == "reflink" and _reflink_pairs.get((dev, dev)) is False:
+            # Known not to clone: one fan-out pass over the source beats copying and then copying again.
+            continue
+        primary = primaries.setdefault(dev, dest_file)
+        if primary != dest_file:
+            shares[dest_file] = primary
+    return shares
+
+def sync_file(source_file, dest_files, size, stats, progress, delta=False, actions=(), shares=None):
+    results = {}
+    fallback = []
+    for action, dest_file, origin in actions:
+        try:
+            _apply_action(source_file, action, dest_file, origin)
+            results[dest_file] = (action, None)
+        except OSError as e:
+            if action == "metadata":
+                results[dest_file] = (None, e)
+            else:
+                # No hard links on this filesystem, or the origin went away: transfer the file after all.
+                fallback.append(dest_file)
+    if delta and size >= DELTA_THRESHOLD:
+        for dest_file in dest_files:
+            try:
+                reused = delta_copy(source_file, dest_file, progress)
+            except FileNotFoundError:
+                continue
+            except OSError as e:
+                results[dest_file] = (None, e)
+                continue
+            if reused is not None:
+                results[dest_file] = ("delta", None)
+                stats.add(bytes_copied=size - reused, delta_bytes_reused=reused)
+    remaining = [dest_file for dest_file in (*dest_files, *fallback) if dest_file not in results]
+    shares = {dest_file: origin for dest_file, origin in (shares or {}).items() if dest_file in remaining}
+    remaining = [dest_file for dest_file in remaining if dest_file not in shares]
+    if remaining:
+        for dest_file, method, error in copy_fanout(source_file, remaining, COPY_BACKENDS, stats, progress):
+            results[dest_file] = (method, error)
+    if shares:
+        unshared = []
+        for dest_file, origin in shares.items():
+            method = None
+            if results.get(origin, (None, True))[1] is None:
+                try:
+                    method = _share_copy(source_file, origin, dest_file, DEST_DEDUP_POLICY)
+                except OSError:
+                    method = None
+            if method:
+                results[dest_file] = (method, None)
+                stats.add(bytes_shared=size)
+                progress(size)
+            else:
+                unshared.append(dest_file)
+        if unshared:
+            for dest_file, method, error in copy_fanout(source_file, unshared, COPY_BACKENDS, stats, progress):
+                results[dest_file] = (method, error)
+    return [(dest_file, *results[dest_file]) for dest_file in (*dest_files, *(action[1] for action in actions))]
+
+# --- Copy Dispatch ---
+
+MAX_IN_FLIGHT = 256
+# Files this small cost more in task and signal overhead than in I/O, so they travel in batches per folder.
+COPY_BATCH_MAX_SIZE = 64 * 1024
+COPY_BATCH_FILES = 128
+COPY_BATCH_BYTES = 4 * 1024 * 1024
+
+class CopyWindow:
+    def __init__(self, executor, limit, on_done):
+        self.executor = executor
+        self.limit = limit
+        self.on_done = on_done
+        self._futures = {}
+        self._completed = queue.SimpleQueue()
+
+    def submit(self, context, fn, *args, **options):
+        while len(self._futures) >= self.limit:
+            self._reap_one()
+        future = self.executor.submit(fn, *args, **options)
+        self._futures[future] = context
+        future.add_done_callback(self._completed.put)
+        self.reap()
+
+    def reap(self):
+        while self._futures and not self._completed.empty():
+            self._reap_one()
+
+    def drain(self, cancel=False):
+        if cancel:
+            for future in list(self._futures):
+                future.cancel()
+        while self._futures:
+            self._reap_one()
+
+    def _reap_one(self):
+        future = self._completed.get()
+        self.on_done(future, self._futures.pop(future))
+
+# Concurrent copies allowed per destination device. One stream keeps a spinning disk sequential; flash wants a
+# deeper queue, and network or virtual disks are latency-bound, so they get the deepest.
+DEVICE_QUEUE_DEPTH = {"rotational": 1, "solid_state": 8, "unknown": 16}
+# A virtual disk's rotational flag describes nothing about the storage behind it.
+_VIRTUAL_DISK_BUSES = ("/virtio", "/xen", "/vmbus")
+DEVICE_WORKERS = 32
+
+def device_kind(dev):
+    if dev is None or not sys.platform.startswith("linux"):
+        return "unknown"
+    sys_block = f"/sys/dev/block/{os.major(dev)}:{os.minor(dev)}"
+    if any(bus in os.path.realpath(sys_block) for bus in _VIRTUAL_DISK_BUSES):
+        return "unknown"
+    # Partitions have no queue of their own; their parent disk's is one level up.
+    for path in (os.path.join(sys_block, "queue", "rotational"), os.path.join(sys_block, "..", "queue", "rotational")):
+        try:
+            with open(path) as f:
+                return "rotational" if f.read().strip() == "1" else "solid_state"
+        except OSError:
+            continue
+    return "unknown"
+
+def device_label(dev):
+    if dev is None:
+        return "unknown device"
+    return f"device {os.major(dev)}:{os.minor(dev)}" if hasattr(os, "major") else f"device {dev}"
+
+class DeviceScheduler:
+    def __init__(self, executor, on_complete=None):
+        self.executor = executor
+        self.on_complete = on_complete
+        self._lock = threading.Lock()
+        self._lanes = {}
+        self._active = {}
+        self._limits = {}
+        self._saturated = set()
+
+    def limit(self, dev):
+        if dev not in self._limits:
+            self._limits[dev] = DEVICE_QUEUE_DEPTH[device_kind(dev)]
+        return self._limits[dev]
+
+    def set_limit(self, dev, limit):
+        with self._lock:
+            self._limits[dev] = limit
+        self._dispatch()
+
+    def take_saturated(self):
+        # Devices that had work waiting on their limit since the last call.
+        with self._lock:
+            saturated, self._saturated = self._saturated, set()
+        return saturated
+
+    def submit(self, fn, *args, devices=(), weight=0):
+        future = Future()
+        devices = tuple(dict.fromkeys(devices))
+        with self._lock:
+            self._lanes.setdefault(devices, deque()).append((future, fn, args, weight))
+        self._dispatch()
+        return future
+
+    def _dispatch(self):
+        ready = []
+        with self._lock:
+            # Round-robin over lanes so a slow disk's backlog never holds up work bound for a faster one.
+            started = True
+            while started:
+                started = False
+                for devices, lane in list(self._lanes.items()):
+                    if not lane:
+                        del self._lanes[devices]
+                        continue
+                    full = [dev for dev in devices if self._active.get(dev, 0) >= self.limit(dev)]
+                    if full:
+                        self._saturated.update(full)
+                        continue
+                    future, fn, args, weight = lane.popleft()
+                    started = True
+                    if not future.set_running_or_notify_cancel():
+                        continue
+                    for dev in devices:
+                        self._active[dev] = self._active.get(dev, 0) + 1
+                    ready.append((devices, future, fn, args, weight))
+        for task in ready:
+            self.executor.submit(self._run, *task)
+
+    def _run(self, devices, future, fn, args, weight):
+        started = time.monotonic()
+        try:
+            result = fn(*args)
+        except BaseException as e:
+            resolve, value = future.set_exception, e
+        else:
+            resolve, value = future.set_result, result
+        try:
+            self._release(devices, weight, started)
+        finally:
+            # Whatever happens while releasing, a future left pending would hang every drain waiting on it.
+            resolve(value)
+
+    def _release(self, devices, weight, started):
+        with self._lock:
+            for dev in devices:
+                self._active[dev] -= 1
+        try:
+            if self.on_complete:
+                self.on_complete(devices, weight, time.monotonic() - started)
+        except Exception:
+            # The callback only feeds tuning; a failure there must not stall the queued copies.
+            pass
+        finally:
+            self._dispatch()
+
+TUNE_INTERVAL = 2.0
+TUNE_MIN_SAMPLES = 8
+TUNE_MAX_DEPTH = DEVICE_WORKERS
+TUNE_TOLERANCE = 0.05
+
+class ConcurrencyTuner:
+    # Hill climbing per device: keep stepping the queue depth the same way while throughput improves, turn back
+    # when it drops. Depth only grows on devices that actually had work waiting on their limit.
+    def __init__(self, scheduler, log):
+        self.scheduler = scheduler
+        self.log = log
+        self._lock = threading.Lock()
+        self._samples = {}
+        self._state = {}
+        self._window_start = time.monotonic()
+
+    def record(self, devices, weight, elapsed):
+        with self._lock:
+            for dev in devices:
+                sample = self._samples.setdefault(dev, [0, 0, 0.0])
+                sample[0] += weight
+                sample[1] += 1
+                sample[2] += elapsed
+            now = time.monotonic()
+            if now - self._window_start >= TUNE_INTERVAL:
+                self._tune(now - self._window_start)
+                self._window_start = now
+
+    def _tune(self, span):
+        saturated = self.scheduler.take_saturated()
+        for dev, (weight, operations, busy) in self._samples.items():
+            if operations < TUNE_MIN_SAMPLES:
+                continue
+            throughput = weight / span
+            depth = self.scheduler.limit(dev)
+            last_throughput, direction = self._state.get(dev, (None, 1))
+            if last_throughput is not None and throughput < last_throughput * (1 - TUNE_TOLERANCE):
+                direction = -direction
+            self._state[dev] = (throughput, direction)
+            new_depth = min(max(depth + direction, 1), TUNE_MAX_DEPTH)
+            if new_depth > depth and dev not in saturated:
+                continue
+            if new_depth != depth:
+                self.scheduler.set_limit(dev, new_depth)
+                self.log(f"Auto-tune: {device_label(dev)} depth {depth} -> {new_depth} "
+                         f"({format_bytes(throughput)}/s, {busy / operations * 1000:.1f} ms per task)")
+        self._samples.clear()
+
+    def summary(self):
+        return [f"Auto-tune: {device_label(dev)} finished at depth {self.scheduler.limit(dev)}."
+                for dev in self._state]
+
+# --- Core Synchronization Logic ---
+
+def _report_copy(worker, stats, future, source_file):
+    if future.cancelled():
+        return
+    source_name = os.path.basename(source_file)
+    try:
+        results = future.result()
+    except Exception as e:
+        stats.add(errors=1)
+        worker.progress.emit(f"Error copying '{source_name}': {e}")
+        return
+    for dest_file, method, error in results:
+        if error is None:
+            if method == "metadata":
+                stats.add(metadata_fixed=1)
+                worker.progress.emit(f"Updated metadata of '{source_name}' in '{os.path.dirname(dest_file)}'")
+            elif method in ("link", "rename"):
+                stats.add(files_relocated=1)
+                worker.progress.emit(f"Reused existing copy of '{source_name}' in '{os.path.dirname(dest_file)}' ({method})")
+            elif method == "hardlink":
+                stats.add(links_preserved=1)
+                worker.progress.emit(f"Linked '{source_name}' in '{os.path.dirname(dest_file)}' (hardlink)")
+            else:
+                stats.add(files_copied=1)
+                worker.progress.emit(f"Copied '{source_name}' ({method})")
+            worker.file_copied.emit(1)
+        elif not isinstance(error, shutil.SameFileError):
+            stats.add(errors=1)
+            worker.progress.emit(f"Error copying '{source_name}' to '{os.path.dirname(dest_file)}': {error}")
+
+def sync_batch(items, stats, progress):
+    results = []
+    for source_file, dest_files, size, shares in items:
+        try:
+            results.append((source_file, sync_file(source_file, dest_files, size, stats, progress, shares=shares)))
+        except Exception as e:
+            results.append((source_file, [(dest_file, None, e) for dest_file in dest_files]))
+    return results
+
+def _report_batch(worker, stats, future, source_parent):
+    if future.cancelled():
+        return
+    try:
+        results = future.result()
+    except Exception as e:
+        stats.add(errors=1)
+        worker.progress.emit(f"Error copying files from '{source_parent}': {e}")
+        return
+    methods = {}
+    for source_file, file_results in results:
+        for dest_file, method, error in file_results:
+            if error is None:
+                methods[method] = methods.get(method, 0) + 1
+            elif not isinstance(error, shutil.SameFileError):
+                stats.add(errors=1)
+                worker.progress.emit(f"Error copying '{os.path.basename(source_file)}' to "
+                                     f"'{os.path.dirname(dest_file)}': {error}")
+    if methods:
+        copied = sum(methods.values())
+        stats.add(files_copied=copied)
+        breakdown = ", ".join(f"{count} {method}" for method, count in sorted(methods.items()))
+        worker.progress.emit(f"Copied {copied} small files from '{source_parent}' ({breakdown})")
+        worker.file_copied.emit(copied)
+
+def _ensure_parent(worker, created_dirs, path):
+    dest_parent = os.path.dirname(path)
+    if dest_parent not in created_dirs:
+        try:
+            os.makedirs(dest_parent, exist_ok=True)
+        except OSError as e:
+            worker.progress.emit(f"Error creating '{dest_parent}': {e}")
+            return False
+        created_dirs.add(dest_parent)
+    return True
+
+def run_plan(worker, plan, meter, delta=False, auto_tune=False):
+    stats = SyncStats()
+    planned_files = 0
+    planned_bytes = 0
+    created_dirs = set()
+    parent_devices = {}
+    # Hard links wait for every copy; their (source, dest, origin) path ids go three at a time into link_ids.
+    link_paths = PathTable()
+    link_ids = array("Q")
+    with ThreadPoolExecutor(max_workers=DEVICE_WORKERS) as executor:
+        scheduler = DeviceScheduler(executor)
+        tuner = None
+        if auto_tune:
+            tuner = ConcurrencyTuner(scheduler, worker.progress.emit)
+            scheduler.on_complete = tuner.record
+        window = CopyWindow(scheduler, MAX_IN_FLIGHT, lambda future, src: _report_copy(worker, stats, future, src))
+        batch_window = CopyWindow(scheduler, MAX_IN_FLIGHT,
+                                  lambda future, parent: _report_batch(worker, stats, future, parent))
+        # devices -> (source_parent, items, bytes) for small files waiting to go out as one task.
+        batches = {}
+
+        def submit_batch(devices):
+            source_parent, items, batch_bytes = batches.pop(devices)
+            batch_window.submit(source_parent, sync_batch, items, stats, meter.add,
+                                devices=devices, weight=batch_bytes)
+
+        for src, dests, size, actions in plan:
+            planned_files += len(dests) + len(actions)
+            planned_bytes += size * len(dests)
+            source_parent = os.path.dirname(src)
+            ready = [dest for dest in dests if _ensure_parent(worker, created_dirs, dest)]
+            actions = [action for action in actions if _ensure_parent(worker, created_dirs, action[1])]
+            # Hard links need their origin's copy to be finished, so they wait until all copies are done.
+            links = [action for action in actions if action[0] == "hardlink"]
+            if links:
+                source_id = link_paths.add(src)
+                for _, dest, origin in links:
+                    link_ids.extend((source_id, link_paths.add(dest), link_paths.add(origin)))
+                actions = [action for action in actions if action[0] != "hardlink"]
+            if not ready and not actions:
+                continue
+            # One task reads the source once for every destination, and starts only when each destination device
+            # is below its depth. It is not gated on the source, so a slow source disk cannot cap faster writes.
+            devices = tuple(sorted({parent_device(path, parent_devices) for path in
+                                    (*ready, *(action[1] for action in actions))}, key=lambda dev: dev or 0))
+            shares = plan_shares(ready, parent_devices, DEST_DEDUP_POLICY)
+            if actions or size > COPY_BATCH_MAX_SIZE or COPY_BATCH_FILES < 2:
+                window.submit(src, sync_file, src, ready, size, stats, meter.add, delta, actions, shares,
+                              devices=devices, weight=size * len(ready))
+                continue
+            # Batches never span folders, so each one writes into a single set of target directories.
+            if devices in batches and batches[devices][0] != source_parent:
+                submit_batch(devices)
+            _, items, batch_bytes = batches.setdefault(devices, (source_parent, [], 0))
+            items.append((src, ready, size, shares))
+            batch_bytes += size * len(ready)
+            batches[devices] = (source_parent, items, batch_bytes)
+            if len(items) >= COPY_BATCH_FILES or batch_bytes >= COPY_BATCH_BYTES:
+                submit_batch(devices)
+            batch_window.reap()
+        if not worker.is_cancellation_requested():
+            for devices in list(batches):
+                submit_batch(devices)
+        window.drain(cancel=worker.is_cancellation_requested())
+        batch_window.drain(cancel=worker.is_cancellation_requested())
+        start = 0
+        while start < len(link_ids) and not worker.is_cancellation_requested():
+            source_id = link_ids[start]
+            links = []
+            while start < len(link_ids) and link_ids[start] == source_id:
+                links.append(("hardlink", link_paths[link_ids[start + 1]], link_paths[link_ids[start + 2]]))
+                start += 3
+            src = link_paths[source_id]
+            window.submit(src, sync_file, src, [], 0, stats, meter.add, False, links)
+        window.drain(cancel=worker.is_cancellation_requested())
+    meter.flush()
+    return stats.summary() + (tuner.summary() if tuner else []), planned_files, planned_bytes
+
+# --- Watch Mode ---
+
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = getattr(os, "O_NONBLOCK", 0)
+IN_CLOEXEC = getattr(os, "O_CLOEXEC", 0)
+WATCH_MASK = IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+# Sync once the tree has been quiet this long, but never hold changes back longer than the maximum delay.
+WATCH_DEBOUNCE = 1.0
+WATCH_MAX_DELAY = 10.0
+WATCH_POLL = 0.5
+_INOTIFY_EVENT = struct.Struct("iIII")
+
+def _inotify_libc():
+    libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+    libc.inotify_init1.argtypes = [ctypes.c_int]
+    libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+    return libc
+
+class InotifyWatcher:
+    def __init__(self, root):
+        if not sys.platform.startswith("linux"):
+            raise OSError(errno.ENOSYS, "Watch mode needs Linux inotify")
+        self._libc = _inotify_libc()
+        self.fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error))
+        self.paths = {}
+        try:
+            self.add_tree(os.fspath(root))
+        except BaseException:
+            self.close()
+            raise
+
+    def _add(self, path):
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), WATCH_MASK | IN_ONLYDIR)
+        if wd < 0:
+            error = ctypes.get_errno()
+            if error == errno.ENOSPC:
+                raise OSError(error, "Out of inotify watches (raise fs.inotify.max_user_watches)")
+            # The directory vanished or is unreadable; its parent's events still cover its name.
+            return
+        self.paths[wd] = path
+
+    def add_tree(self, root):
+        pending = [root]
+        while pending:
+            path = pending.pop()
+            self._add(path)
+            try:
+                with os.scandir(path) as entries:
+                    pending.extend(entry.path for entry in entries if entry.is_dir(follow_symlinks=False))
+            except OSError:
+                continue
+
+    def read(self, timeout):
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        events = []
+        while ready:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = _INOTIFY_EVENT.unpack_from(data, offset)
+                offset += _INOTIFY_EVENT.size
+                name = data[offset:offset + length].rstrip(b"\0")
+                offset += length
+                if mask & IN_Q_OVERFLOW:
+                    events.append((None, mask))
+                elif mask & IN_IGNORED:
+                    self.paths.pop(wd, None)
+                elif wd in self.paths:
+                    parent = self.paths[wd]
+                    events.append((os.path.join(parent, os.fsdecode(name)) if name else parent, mask))
+        return events
+
+    def close(self):
+        os.close(self.fd)
+
+def _changed_tree(worker, source_root, changed_files, changed_dirs):
+    # New or moved-in directories are rescanned whole; nested ones are covered by their outermost ancestor.
+    roots = [path for path in sorted(changed_dirs)
+             if not any(path.startswith(other + os.sep) for other in changed_dirs)]
+    groups = {}
+    for path in changed_files:
+        if any(path.startswith(root + os.sep) for root in roots):
+            continue
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        if stat.S_ISREG(st.st_mode):
+            rel_dir, name = os.path.split(os.path.relpath(path, source_root))
+            groups.setdefault(rel_dir, []).append((name, st))
+    for rel_dir, files in sorted(groups.items()):
+        yield rel_dir, sorted(files, key=lambda item: item[0])
+    for root in roots:
+        prefix = os.path.relpath(root, source_root)
+        for rel_dir, files in scan_source_tree(worker, root):
+            yield (os.path.join(prefix, rel_dir) if rel_dir else prefix), files
+
+def _reported_plan(worker, plan, totals):
+    # Streams plan items to the copy loop while growing the progress totals, which carry over between batches.
+    last_report = 0
+    for item in plan:
+        _, dest_files, size, actions = item
+        totals[0] += len(dest_files) + len(actions)
+        totals[1] += size * len(dest_files)
+        now = time.monotonic()
+        if now - last_report >= PROGRESS_INTERVAL:
+            worker.total_files.emit(totals[0])
+            worker.total_bytes.emit(totals[1])
+            last_report = now
+        yield item
+    worker.total_files.emit(totals[0])
+    worker.total_bytes.emit(totals[1])
+
+def watch_source(worker, source_dir, dest_dirs, watcher, meter, totals, compare_mode="mtime", delta=False,
+                 auto_tune=False):
+    source_root = os.fspath(source_dir)
+    totals = list(totals)
+    changed_files = set()
+    changed_dirs = set()
+    overflowed = False
+    first_change = last_change = None
+    worker.progress.emit(f"Watching '{source_root}' for changes. Cancel to stop.")
+    comparer = open_comparer(worker, compare_mode)
+    touch_comparer = open_touch_comparer() if comparer is None else None
+    try:
+        while not worker.is_cancellation_requested():
+            events = watcher.read(WATCH_POLL)
+            now = time.monotonic()
+            for path, mask in events:
+                if path is None:
+                    overflowed = True
+                elif mask & IN_ISDIR:
+                    if mask & (IN_CREATE | IN_MOVED_TO):
+                        watcher.add_tree(path)
+                        changed_dirs.add(path)
+                else:
+                    changed_files.add(path)
+                first_change = first_change or now
+                last_change = now
+            if first_change is None:
+                continue
+            if now - last_change < WATCH_DEBOUNCE and now - first_change < WATCH_MAX_DELAY:
+                continue
+
+            if overflowed:
+                # Events were dropped, so nothing short of a full pass can say what changed.
+                worker.progress.emit("Watch: the kernel event queue overflowed, rescanning the whole source.")
+                watcher.add_tree(source_root)
+                tree = None
+            else:
+                worker.progress.emit(f"Watch: {len(changed_files) + len(changed_dirs)} changed paths.")
+                tree = _changed_tree(worker, source_root, changed_files, changed_dirs)
+            changed_files = set()
+            changed_dirs = set()
+            overflowed = False
+            first_change = last_change = None
+
+            # Streamed like the initial sync, so even a full rescan after an overflow starts copying right away.
+            plan = plan_copies(worker, source_root, dest_dirs, comparer=comparer, tree=tree, touch_comparer=touch_comparer)
+            summary, batch_files, _ = run_plan(worker, _reported_plan(worker, plan, totals), meter, delta, auto_tune)
+            if batch_files:
+                for line in summary:
+                    worker.progress.emit(line)
+    finally:
+        if comparer:
+            comparer.close()
+        if touch_comparer:
+            touch_comparer.close()
+
+def sync_folders_for_gui(worker, source_dir: Path, dest_dirs: list[Path], dry_run: bool, delta: bool = False,
+                         compare_mode: str = "mtime", detect_moves: bool = False, auto_tune: bool = False,
+                         incremental: bool = False, prune_dirs: bool = False, watch: bool = False):
+    producer = None
+    watcher = None
+    try:
+        if watch and not dry_run:
+            # Watches go up before the initial scan so nothing changed during it is missed.
+            try:
+                watcher = InotifyWatcher(source_dir)
+            except OSError as e:
+                worker.progress.emit(f"Watch mode unavailable: {e}")
+        elif watch:
+            worker.progress.emit("Watch mode is skipped for dry runs.")
+        worker.progress.emit(f"Scanning for files to sync from '{source_dir}'...")
+        producer, plan_queue, errors = start_plan_producer(worker, source_dir, dest_dirs, compare_mode, detect_moves,
+                                                           incremental, prune_dirs)
+
+        if dry_run:
+            worker.progress.emit("--- DRY RUN MODE ENABLED ---")
+            for src, dests, _, actions in iter_plan_queue(worker, plan_queue):
+                for dest in dests:
+                    worker.progress.emit(f"Will copy '{os.path.basename(src)}' to '{os.path.dirname(dest)}'")
+                    worker.file_copied.emit(1)
+                for action, dest, origin in actions:
+                    if action == "metadata":
+                        worker.progress.emit(f"Will update metadata of '{os.path.basename(src)}' in '{os.path.dirname(dest)}'")
+                    else:
+                        worker.progress.emit(f"Will {action} '{origin}' to '{dest}'")
+                    worker.file_copied.emit(1)
+            worker.progress.emit("--- DRY RUN MODE CONCLUDED ---")
+        else:
+            meter = ByteMeter(worker.bytes_copied.emit)
+            summary, planned_files, planned_bytes = run_plan(worker, iter_plan_queue(worker, plan_queue), meter,
+                                                             delta, auto_tune)
+            for line in summary:
+                worker.progress.emit(line)
+
+        producer.join()
+        if errors:
+            raise errors[0]
 
         if worker.is_cancellation_requested():
             worker.progress.emit("Synchronization cancelled by user.")
-        else:
+        elif not dry_run:
             worker.progress.emit("Synchronization process completed successfully.")
+            if watcher:
+                watch_source(worker, source_dir, dest_dirs, watcher, meter, (planned_files, planned_bytes),
+                             compare_mode, delta, auto_tune)
+                worker.progress.emit("Stopped watching for changes.")
 
     except Exception as e:
         worker.progress.emit(f"An unexpected error occurred: {e}")
+    finally:
+        if watcher:
+            watcher.close()
+        if producer is not None and producer.is_alive():
+            worker.request_cancellation()
+            producer.join()
 
 # --- Worker Thread ---
 
@@ -92,18 +2131,30 @@ class SyncWorker(QObject):
     progress = pyqtSignal(str)
     finished = pyqtSignal()
     total_files = pyqtSignal(int)
-    file_copied = pyqtSignal()
+    total_bytes = pyqtSignal("qlonglong")
+    scan_finished = pyqtSignal()
+    file_copied = pyqtSignal(int)
+    bytes_copied = pyqtSignal("qlonglong")
 
-    def __init__(self, source_dir, dest_dirs, dry_run):
+    def __init__(self, source_dir, dest_dirs, dry_run, delta=False, compare_mode="mtime", detect_moves=False,
+                 auto_tune=False, incremental=False, prune_dirs=False, watch=False):
         super().__init__()
         self.source_dir = source_dir
         self.dest_dirs = dest_dirs
         self.dry_run = dry_run
+        self.delta = delta
+        self.compare_mode = compare_mode
+        self.detect_moves = detect_moves
+        self.auto_tune = auto_tune
+        self.incremental = incremental
+        self.prune_dirs = prune_dirs
+        self.watch = watch
         self._is_cancellation_requested = False
 
     def run(self):
         if self.source_dir and self.dest_dirs:
-            sync_folders_for_gui(self, self.source_dir, self.dest_dirs, self.dry_run)
+            sync_folders_for_gui(self, self.source_dir, self.dest_dirs, self.dry_run, self.delta, self.compare_mode,
+                                 self.detect_moves, self.auto_tune, self.incremental, self.prune_dirs, self.watch)
         self.finished.emit()
 
     def request_cancellation(self):
@@ -114,6 +2165,10 @@ class SyncWorker(QObject):
 
 # --- Main Application Window ---
 
+PROGRESS_BAR_STEPS = 1000
+COMPARE_MODES = (("Modification time", "mtime"), ("Quick fingerprint", "fingerprint"), ("Checksum", "checksum"))
+RATE_SAMPLE_INTERVAL = 1.0
+
 class SyncApp(QWidget):
     def __init__(self):
         super().__init__()
@@ -169,17 +2224,45 @@ class SyncApp(QWidget):
         self.progress_bar = QProgressBar()
         self.progress_bar.setVisible(False)
         main_layout.addWidget(self.progress_bar)
+        self.transfer_label = QLabel()
+        self.transfer_label.setVisible(False)
+        main_layout.addWidget(self.transfer_label)
 
-        # Controls
-        controls_layout = QHBoxLayout()
+        # Options
         self.dry_run_checkbox = QCheckBox("Dry Run (Simulate sync)")
+        self.delta_checkbox = QCheckBox("Delta transfer for large files")
+        self.moves_checkbox = QCheckBox("Detect moved files")
+        self.tune_checkbox = QCheckBox("Auto-tune concurrency")
+        self.incremental_checkbox = QCheckBox("Incremental scan")
+        self.prune_checkbox = QCheckBox("Skip unchanged folders")
+        self.watch_checkbox = QCheckBox("Keep watching for changes")
+        self.prune_checkbox.setToolTip("Folders whose modification time has not changed are not re-read. Edits made "
+                                       "inside existing files there are only picked up by the weekly full scan.")
+        self.compare_label = QLabel("Compare by:")
+        self.compare_combo = QComboBox()
+        for label, mode in COMPARE_MODES:
+            self.compare_combo.addItem(label, mode)
         self.sync_btn = QPushButton("Start Sync")
         self.sync_btn.setStyleSheet("background-color: #4CAF50; color: white; padding: 10px;")
         self.sync_btn.clicked.connect(self.start_sync)
         self.cancel_btn = QPushButton("Cancel")
         self.cancel_btn.clicked.connect(self.cancel_sync)
         self.cancel_btn.setEnabled(False)
-        controls_layout.addWidget(self.dry_run_checkbox)
+        options_box = QGroupBox("Options")
+        options_layout = QGridLayout(options_box)
+        checkboxes = [self.dry_run_checkbox, self.delta_checkbox, self.moves_checkbox, self.tune_checkbox,
+                      self.incremental_checkbox, self.prune_checkbox, self.watch_checkbox]
+        for i, checkbox in enumerate(checkboxes):
+            options_layout.addWidget(checkbox, i // 3, i % 3)
+        compare_layout = QHBoxLayout()
+        compare_layout.addWidget(self.compare_label)
+        compare_layout.addWidget(self.compare_combo)
+        compare_layout.addStretch()
+        options_layout.addLayout(compare_layout, (len(checkboxes) + 2) // 3, 0, 1, 3)
+        main_layout.addWidget(options_box)
+
+        # Controls
+        controls_layout = QHBoxLayout()
         controls_layout.addStretch()
         controls_layout.addWidget(self.sync_btn)
         controls_layout.addWidget(self.cancel_btn)
@@ -233,7 +2316,14 @@ class SyncApp(QWidget):
         profile_data = {
             "source": str(self.source_dir),
             "destinations": dest_paths,
-            "dry_run": self.dry_run_checkbox.isChecked()
+            "dry_run": self.dry_run_checkbox.isChecked(),
+            "delta_transfer": self.delta_checkbox.isChecked(),
+            "compare_mode": self.compare_combo.currentData(),
+            "detect_moves": self.moves_checkbox.isChecked(),
+            "auto_tune": self.tune_checkbox.isChecked(),
+            "incremental": self.incremental_checkbox.isChecked(),
+            "prune_dirs": self.prune_checkbox.isChecked(),
+            "watch": self.watch_checkbox.isChecked()
         }
 
         file_path, _ = QFileDialog.getSaveFileName(self, "Save Profile", "sync_profile.json", "JSON Files (*.json)")
@@ -260,15 +2350,79 @@ class SyncApp(QWidget):
                     self.dest_list_widget.addItem(dest)
 
                 self.dry_run_checkbox.setChecked(profile_data.get("dry_run", False))
+                self.delta_checkbox.setChecked(profile_data.get("delta_transfer", False))
+                self.compare_combo.setCurrentIndex(max(self.compare_combo.findData(profile_data.get("compare_mode", "mtime")), 0))
+                self.moves_checkbox.setChecked(profile_data.get("detect_moves", False))
+                self.tune_checkbox.setChecked(profile_data.get("auto_tune", False))
+                self.incremental_checkbox.setChecked(profile_data.get("incremental", False))
+                self.prune_checkbox.setChecked(profile_data.get("prune_dirs", False))
+                self.watch_checkbox.setChecked(profile_data.get("watch", False))
                 QMessageBox.information(self, "Success", "Profile loaded successfully.")
             except Exception as e:
                 QMessageBox.warning(self, "Error", f"Failed to load profile: {e}")
 
+    def update_log(self, message):
+        self.log_output.append(message)
+
+    def reset_progress(self, dry_run):
+        self.progress_dry_run = dry_run
+        self.scanning = True
+        self.files_done = 0
+        self.files_total = 0
+        self.bytes_done = 0
+        self.bytes_total = 0
+        self.transfer_rate = None
+        self.rate_sample = (time.monotonic(), 0)
+        self.progress_bar.setMaximum(0)
+        self.progress_bar.setValue(0)
+        self.progress_bar.setFormat("Scanning...")
+        self.transfer_label.setText("")
+
+    def refresh_progress(self):
+        if self.scanning and not self.files_total:
+            return
+        approx = "~" if self.scanning else ""
+        if self.bytes_total and not self.progress_dry_run:
+            fraction = min(self.bytes_done / self.bytes_total, 1.0)
+        elif self.files_total:
+            fraction = self.files_done / self.files_total
+        else:
+            fraction = 1.0
+        self.progress_bar.setMaximum(PROGRESS_BAR_STEPS)
+        self.progress_bar.setValue(int(fraction * PROGRESS_BAR_STEPS))
+        self.progress_bar.setFormat(f"{self.files_done} of {approx}{self.files_total} files ({fraction:.0%})")
+
+        if self.transfer_rate:
+            remaining = max(self.bytes_total - self.bytes_done, 0) / self.transfer_rate
+            self.transfer_label.setText(
+                f"{format_bytes(self.transfer_rate)}/s - {format_bytes(self.bytes_done)} of "
+                f"{approx}{format_bytes(self.bytes_total)} - ETA {approx}{format_duration(remaining)}")
+
     def set_progress_max(self, value):
-        self.progress_bar.setMaximum(value)
+        self.files_total = value
+        self.refresh_progress()
 
-    def update_progress_bar(self):
-        self.progress_bar.setValue(self.progress_bar.value() + 1)
+    def set_bytes_total(self, value):
+        self.bytes_total = value
+        self.refresh_progress()
+
+    def set_progress_total_final(self):
+        self.scanning = False
+        self.refresh_progress()
+
+    def update_progress_bar(self, count):
+        self.files_done += count
+        self.refresh_progress()
+
+    def update_bytes_progress(self, copied):
+        now = time.monotonic()
+        sample_time, sample_bytes = self.rate_sample
+        if now - sample_time >= RATE_SAMPLE_INTERVAL:
+            rate = (copied - sample_bytes) / (now - sample_time)
+            self.transfer_rate = rate if self.transfer_rate is None else 0.7 * self.transfer_rate + 0.3 * rate
+            self.rate_sample = (now, copied)
+        self.bytes_done = copied
+        self.refresh_progress()
 
     def set_controls_enabled(self, enabled):
         is_syncing = not enabled
@@ -277,6 +2431,13 @@ class SyncApp(QWidget):
         self.dest_remove_btn.setEnabled(enabled)
         self.sync_btn.setEnabled(enabled)
         self.dry_run_checkbox.setEnabled(enabled)
+        self.delta_checkbox.setEnabled(enabled)
+        self.moves_checkbox.setEnabled(enabled)
+        self.tune_checkbox.setEnabled(enabled)
+        self.incremental_checkbox.setEnabled(enabled)
+        self.prune_checkbox.setEnabled(enabled)
+        self.watch_checkbox.setEnabled(enabled)
+        self.compare_combo.setEnabled(enabled)
         self.save_log_btn.setEnabled(enabled)
         self.save_profile_btn.setEnabled(enabled)
         self.load_profile_btn.setEnabled(enabled)
@@ -294,12 +2455,17 @@ class SyncApp(QWidget):
             return
 
         self.log_output.clear()
-        self.progress_bar.setValue(0)
+        self.reset_progress(self.dry_run_checkbox.isChecked())
         self.progress_bar.setVisible(True)
+        self.transfer_label.setVisible(True)
         self.set_controls_enabled(False)
 
         self.thread = QThread()
-        self.worker = SyncWorker(self.source_dir, dest_paths, self.dry_run_checkbox.isChecked())
+        self.worker = SyncWorker(self.source_dir, dest_paths, self.dry_run_checkbox.isChecked(),
+                                 self.delta_checkbox.isChecked(), self.compare_combo.currentData(),
+                                 self.moves_checkbox.isChecked(), self.tune_checkbox.isChecked(),
+                                 self.incremental_checkbox.isChecked(), self.prune_checkbox.isChecked(),
+                                 self.watch_checkbox.isChecked())
         self.worker.moveToThread(self.thread)
 
         self.thread.started.connect(self.worker.run)
@@ -308,7 +2474,10 @@ class SyncApp(QWidget):
         self.thread.finished.connect(self.thread.deleteLater)
         self.worker.progress.connect(self.update_log)
         self.worker.total_files.connect(self.set_progress_max)
+        self.worker.total_bytes.connect(self.set_bytes_total)
+        self.worker.scan_finished.connect(self.set_progress_total_final)
         self.worker.file_copied.connect(self.update_progress_bar)
+        self.worker.bytes_copied.connect(self.update_bytes_progress)
         self.thread.finished.connect(self.sync_finished)
 
         self.thread.start()
@@ -320,6 +2489,7 @@ class SyncApp(QWidget):
     def sync_finished(self):
         self.set_controls_enabled(True)
         self.progress_bar.setVisible(False)
+        self.transfer_label.setVisible(False)
         QMessageBox.information(self, "Success", "Synchronization process has finished.")
 
 if __name__ == "__main__":
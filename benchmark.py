@@ -0,0 +1,286 @@
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+import PySync
+
+
+class BenchWorker:
+    class _Signal:
+        def __init__(self):
+            self.emits = 0
+
+        def emit(self, *args):
+            self.emits += 1
+
+    def __init__(self):
+        self.progress = self._Signal()
+        for name in ("total_files", "total_bytes", "scan_finished", "file_copied", "bytes_copied"):
+            setattr(self, name, self._Signal())
+
+    def signals_emitted(self):
+        return sum(signal.emits for signal in vars(self).values() if isinstance(signal, self._Signal))
+
+    def is_cancellation_requested(self):
+        return False
+
+
+class StatCounter:
+    def __init__(self):
+        self.calls = 0
+        self.listings = 0
+        self._os_stat = os.stat
+        self._os_scandir = os.scandir
+
+    def __enter__(self):
+        counter = self
+        real_stat = self._os_stat
+        real_scandir = self._os_scandir
+
+        class CountingEntry:
+            def __init__(self, entry):
+                self._entry = entry
+
+            def __getattr__(self, name):
+                return getattr(self._entry, name)
+
+            def stat(self, **kwargs):
+                counter.calls += 1
+                return self._entry.stat(**kwargs)
+
+        class CountingScandir:
+            def __init__(self, path):
+                counter.listings += 1
+                self._it = real_scandir(path)
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                self._it.close()
+
+            def __iter__(self):
+                return self
+
+            def __next__(self):
+                return CountingEntry(next(self._it))
+
+            def close(self):
+                self._it.close()
+
+        def counting_stat(*args, **kwargs):
+            counter.calls += 1
+            return real_stat(*args, **kwargs)
+
+        os.stat = counting_stat
+        os.scandir = CountingScandir
+        return self
+
+    def __exit__(self, *exc):
+        os.stat = self._os_stat
+        os.scandir = self._os_scandir
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def counted(func, *args):
+    with StatCounter() as counter:
+        func(*args)
+    return counter.calls, counter.listings
+
+
+def make_tree(root, files, files_per_dir=100, size=0):
+    payload = b"x" * size
+    for i in range(files):
+        folder = os.path.join(root, f"d{i // files_per_dir // 50:03}", f"d{i // files_per_dir:05}")
+        if i % files_per_dir == 0:
+            os.makedirs(folder, exist_ok=True)
+        with open(os.path.join(folder, f"f{i:08}.dat"), "wb") as f:
+            f.write(payload)
+
+
+def mirror_half(source, dest):
+    for dirpath, _, filenames in os.walk(source):
+        target = os.path.join(dest, os.path.relpath(dirpath, source))
+        os.makedirs(target, exist_ok=True)
+        for filename in filenames[::2]:
+            shutil.copy2(os.path.join(dirpath, filename), os.path.join(target, filename))
+
+def flatten_plan(plan):
+    return [(src, dest) for src, dest_files, *_ in plan for dest in dest_files]
+
+# --- Legacy implementations (baseline for comparison) ---
+
+def legacy_plan(source_dir, dest_dirs):
+    files_to_copy = []
+    for dirpath, _, filenames in os.walk(source_dir):
+        for filename in filenames:
+            source_file_path = Path(dirpath) / filename
+            relative_path = source_file_path.relative_to(source_dir)
+            for dest_dir in dest_dirs:
+                dest_file_path = dest_dir / relative_path
+                should_copy = True
+                if dest_file_path.exists():
+                    if source_file_path.stat().st_mtime <= dest_file_path.stat().st_mtime:
+                        should_copy = False
+                if should_copy:
+                    files_to_copy.append((source_file_path, dest_file_path))
+    return files_to_copy
+
+# --- Benchmarks ---
+
+def bench_scan(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        source = Path(tmp, "source")
+        dests = [Path(tmp, f"dest{i}") for i in range(args.dests)]
+        make_tree(source, args.files)
+        for dest in dests:
+            mirror_half(source, dest)
+
+        worker = BenchWorker()
+        legacy = lambda: legacy_plan(source, dests)
+        runs = [("os.walk + Path", legacy)]
+        for threads in args.scan_threads:
+            runs.append((f"scandir x{threads}",
+                         lambda threads=threads: flatten_plan(PySync.plan_copies(worker, source, dests, threads))))
+
+        print(f"{args.files} files, {args.dests} destinations")
+        for name, func in runs:
+            plan, elapsed = timed(func)
+            stats, listings = counted(func)
+            print(f"  {name:<16} {elapsed:8.3f}s  {stats:>9} stat calls  {listings:>7} listings  "
+                  f"{len(plan)} planned copies")
+
+
+def _copy_files(pairs, copy):
+    start = time.perf_counter()
+    for src, dest in pairs:
+        copy(src, dest)
+    return time.perf_counter() - start
+
+
+def bench_copy(args):
+    backends = [(name, lambda src, dest, name=name: PySync.copy_file(src, dest, (name,)))
+                for name in PySync.COPY_BACKENDS if name in ("reflink", "userspace") or name in PySync._KERNEL_COPIES]
+    backends.append(("shutil.copy2", shutil.copy2))
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        large = os.path.join(tmp, "large.bin")
+        with open(large, "wb") as f:
+            for _ in range(args.large_mb):
+                f.write(os.urandom(1024 * 1024))
+        small_dir = os.path.join(tmp, "small")
+        make_tree(small_dir, args.small_files, size=args.small_kb * 1024)
+        small = [(os.path.join(dirpath, name), os.path.join(tmp, f"out-{i}"))
+                 for dirpath, _, names in os.walk(small_dir) for i, name in enumerate(names)]
+
+        print(f"large: 1 x {args.large_mb} MB, small: {args.small_files} x {args.small_kb} KB")
+        for name, copy in backends:
+            try:
+                large_time = _copy_files([(large, os.path.join(tmp, "large.out"))], copy)
+                small_time = _copy_files(small, copy)
+            except OSError as e:
+                print(f"  {name:<16} unsupported here: {e}")
+                continue
+            print(f"  {name:<16} large {args.large_mb / large_time:9.1f} MB/s   "
+                  f"small {args.small_files / small_time:9.0f} files/s")
+
+
+def bench_small_files(args):
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        source = Path(tmp, "source")
+        make_tree(source, args.files, files_per_dir=1000, size=args.size_kb * 1024)
+        runs = [("per-file tasks", 1), ("batched tasks", PySync.COPY_BATCH_FILES)]
+
+        print(f"{args.files} files x {args.size_kb} KB, {args.dests} destinations")
+        for name, batch_files in runs:
+            dests = [Path(tmp, f"{name.split()[0]}-dest{i}") for i in range(args.dests)]
+            worker = BenchWorker()
+            saved, PySync.COPY_BATCH_FILES = PySync.COPY_BATCH_FILES, batch_files
+            try:
+                _, elapsed = timed(PySync.sync_folders_for_gui, worker, source, dests, False)
+            finally:
+                PySync.COPY_BATCH_FILES = saved
+            print(f"  {name:<16} {elapsed:8.2f}s  {args.files / elapsed:9.0f} files/s  "
+                  f"{worker.signals_emitted():>9} signals")
+            for dest in dests:
+                shutil.rmtree(dest)
+
+
+def link_snapshot(source, snapshot, dests):
+    # rsnapshot-style: every file gets a second name in a sibling tree, and the destinations already hold the
+    # first names, so the sync plans one hard link per file and copies no data.
+    for dirpath, _, filenames in os.walk(source):
+        rel_dir = os.path.relpath(dirpath, source)
+        targets = [os.path.join(root, rel_dir) for root in (snapshot, *dests)]
+        for target in targets:
+            os.makedirs(target, exist_ok=True)
+        for filename in filenames:
+            for target in targets:
+                os.link(os.path.join(dirpath, filename), os.path.join(target, filename))
+
+
+def bench_pipeline_memory(args):
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        source = Path(tmp, "source")
+        dests = [Path(tmp, f"dest{i}") for i in range(args.dests)]
+        make_tree(source / "data", args.files, files_per_dir=1000)
+        link_snapshot(source / "data", source / "snapshot", [dest / "data" for dest in dests])
+
+        print(f"{args.files} files with 2 names each, {args.dests} destinations")
+        worker = BenchWorker()
+        tracemalloc.start()
+        try:
+            _, elapsed = timed(PySync.sync_folders_for_gui, worker, source, dests, False)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        print(f"  {peak / 1024 / 1024:9.1f} MB peak  {peak / args.files:7.1f} B/file  {elapsed:8.2f}s (traced)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PySync benchmarks")
+    subparsers = parser.add_subparsers(dest="bench", required=True)
+
+    scan = subparsers.add_parser("scan", help="source scan and copy planning")
+    scan.add_argument("--files", type=int, default=20000)
+    scan.add_argument("--dests", type=int, default=2)
+    scan.add_argument("--scan-threads", type=int, nargs="+", default=[1, PySync.SCAN_THREADS])
+    scan.set_defaults(func=bench_scan)
+
+    copy = subparsers.add_parser("copy", help="single-destination copy backends")
+    copy.add_argument("--large-mb", type=int, default=512)
+    copy.add_argument("--small-files", type=int, default=5000)
+    copy.add_argument("--small-kb", type=int, default=4)
+    copy.add_argument("--dir", default=None, help="filesystem to benchmark on (default: system temp dir)")
+    copy.set_defaults(func=bench_copy)
+
+    small = subparsers.add_parser("small-files", help="full sync of a tree of many small files")
+    small.add_argument("--files", type=int, default=100_000)
+    small.add_argument("--size-kb", type=int, default=2)
+    small.add_argument("--dests", type=int, default=1)
+    small.add_argument("--dir", default=None, help="filesystem to benchmark on (default: system temp dir)")
+    small.set_defaults(func=bench_small_files)
+
+    pipeline_memory = subparsers.add_parser("pipeline-memory", help="peak memory of a full sync that recreates "
+                                            "one hard link per file (try --files 2000000)")
+    pipeline_memory.add_argument("--files", type=int, default=200_000)
+    pipeline_memory.add_argument("--dests", type=int, default=1)
+    pipeline_memory.add_argument("--dir", default=None, help="filesystem to benchmark on (default: system temp dir)")
+    pipeline_memory.set_defaults(func=bench_pipeline_memory)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+import os
+import random
+import zlib
+
+import pytest
+
+import PySync
+
+BLOCK = 1024
+
+
+def apply_ops(ops, source, dest):
+    out = bytearray()
+    for op in ops:
+        if op[0] == "copy":
+            out += source[op[1]:op[2]]
+        else:
+            assert len(out) == op[1]
+            out += dest[op[2]:op[2] + op[3]]
+    return bytes(out)
+
+
+def reused(ops):
+    return sum(op[3] for op in ops if op[0] == "reuse")
+
+
+@pytest.fixture
+def dest():
+    return random.Random(7).randbytes(64 * BLOCK)
+
+
+def test_roll_adler32_matches_zlib():
+    data = random.Random(1).randbytes(3 * BLOCK)
+    weak = zlib.adler32(data[:BLOCK])
+    for offset in range(2 * BLOCK):
+        weak = PySync._roll_adler32(weak, data[offset], data[offset + BLOCK], BLOCK)
+        assert weak == zlib.adler32(data[offset + 1:offset + 1 + BLOCK])
+
+
+def test_identical_file_is_one_reuse(dest):
+    assert PySync._delta_ops(dest, dest, BLOCK) == [("reuse", 0, 0, len(dest))]
+
+
+def test_in_place_edits_stay_aligned(dest):
+    source = bytearray(dest)
+    for offset in range(100, len(source), 7 * BLOCK):
+        source[offset:offset + 10] = b"x" * 10
+    source = bytes(source)
+    ops = PySync._delta_ops(source, dest, BLOCK)
+    assert apply_ops(ops, source, dest) == source
+    assert all(op[0] == "copy" or op[1] == op[2] for op in ops)
+    assert reused(ops) == len(dest) - 10 * BLOCK
+
+
+@pytest.mark.parametrize("length", [1, 300, BLOCK, 2 * BLOCK + 5])
+def test_insert_is_found_by_rolling(dest, length):
+    at = 20 * BLOCK + 17
+    source = dest[:at] + os.urandom(length) + dest[at:]
+    ops = PySync._delta_ops(source, dest, BLOCK)
+    assert apply_ops(ops, source, dest) == source
+    assert reused(ops) >= len(dest) - 2 * BLOCK
+
+
+def test_removed_range_is_found_by_rolling(dest):
+    source = dest[:10 * BLOCK + 3] + dest[10 * BLOCK + 500:]
+    ops = PySync._delta_ops(source, dest, BLOCK)
+    assert apply_ops(ops, source, dest) == source
+    assert reused(ops) >= len(dest) - 2 * BLOCK
+
+
+def test_truncate_and_append(dest):
+    for source in (dest[:40 * BLOCK + 123], dest + os.urandom(5 * BLOCK + 9)):
+        ops = PySync._delta_ops(source, dest, BLOCK)
+        assert apply_ops(ops, source, dest) == source
+        assert reused(ops) >= min(len(source), len(dest)) - BLOCK
+
+
+def test_unrelated_content_gives_up(dest):
+    assert PySync._delta_ops(os.urandom(len(dest)), dest, BLOCK) is None